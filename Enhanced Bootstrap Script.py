@@ -4,6 +4,7 @@ import sys
 import requests
 import subprocess
 import signal
+import shutil
 import time
 import uuid # Import uuid for get_device_id fallback
 import logging # Import the logging module
@@ -16,11 +17,23 @@ BACKEND = os.environ.get("CLOUDROM_BACKEND", "")
 MOUNTPOINT = os.environ.get("MOUNTPOINT", "/mnt/cloud")
 FUSE_BIN = os.environ.get("FUSE_BIN", "/usr/local/bin/cloudfs_fuse.py") # Path to the FUSE client script
 
+# Device ID resolved on first call; the DMI/MAC/hostname probes never change for the process lifetime
+_DEVICE_ID = None
+
 def get_device_id():
     """
     Attempts to retrieve a unique device ID using multiple methods,
     prioritizing hardware-based identifiers.
+    The result is memoized so later calls skip the DMI read and MAC lookup.
     """
+    global _DEVICE_ID
+    if _DEVICE_ID is not None:
+        return _DEVICE_ID
+    _DEVICE_ID = _probe_device_id()
+    return _DEVICE_ID
+
+def _probe_device_id():
+    """Runs the DMI -> MAC -> hostname probes once for get_device_id()."""
     try:
         # Try to get UUID from DMI (Desktop Management Interface) on Linux systems
         with open('/sys/class/dmi/id/product_uuid') as f:
@@ -81,6 +94,25 @@ def authenticate(max_retries=3, backoff=2):
             logging.critical(f"An unexpected error occurred during authentication: {e}. Exiting.")
             sys.exit(1)
 
+def stop_fuse(proc, timeout=5):
+    """
+    Terminates the FUSE client, escalating to SIGKILL if it does not exit within timeout.
+    A killed client cannot unmount itself, so the mount is then detached lazily.
+    """
+    if proc.poll() is not None:
+        return
+    proc.terminate() # Send SIGTERM; libfuse in the client exits its loop and unmounts
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logging.warning(f"FUSE client did not exit within {timeout}s, killing it...")
+        proc.kill()
+        proc.wait()
+        if shutil.which('fusermount'):
+            # -z detaches the mount even while busy so the mountpoint is not left stale
+            subprocess.run(['fusermount', '-u', '-z', MOUNTPOINT],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+
 def run_fuse(token):
     """Launches the FUSE client as a subprocess and handles its lifecycle."""
     env = os.environ.copy() # Copy current environment
@@ -88,25 +120,22 @@ def run_fuse(token):
     env['CLOUDROM_BACKEND'] = BACKEND # Pass the backend URL
     env['MOUNTPOINT'] = MOUNTPOINT # Pass the mountpoint
 
-    # Create the mountpoint directory if it doesn't exist
-    if not os.path.exists(MOUNTPOINT):
-        try:
-            os.makedirs(MOUNTPOINT)
-            logging.info(f"Created mountpoint directory: {MOUNTPOINT}")
-        except OSError as e:
-            logging.critical(f"Failed to create mountpoint directory {MOUNTPOINT}: {e}. Exiting.")
-            sys.exit(1)
+    # Create the mountpoint directory (no-op if it already exists)
+    try:
+        os.makedirs(MOUNTPOINT, exist_ok=True)
+    except OSError as e:
+        logging.critical(f"Failed to create mountpoint directory {MOUNTPOINT}: {e}. Exiting.")
+        sys.exit(1)
 
     logging.info(f"Launching FUSE client {FUSE_BIN} at mountpoint {MOUNTPOINT}...")
     try:
-        # Use subprocess.Popen to allow for graceful termination handling
+        # Use subprocess.Popen to allow for graceful termination handling.
         proc = subprocess.Popen(["python3", FUSE_BIN], env=env)
 
         # Gracefully handle termination signals
         def signal_handler(signum, frame):
             logging.info("Received termination signal, stopping FUSE client...")
-            proc.terminate() # Send SIGTERM to the FUSE client process
-            proc.wait()      # Wait for the FUSE client to exit
+            stop_fuse(proc)
             sys.exit(0)
 
         signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C
@@ -1,6 +1,6 @@
 # ----------- Stage 1: Build dependencies --------------
 # Use a specific, slim Python base image for consistency and smaller size
-FROM python:3.9.18-slim-bullseye AS builder
+FROM python:3.12-slim-bookworm AS builder
 
 # Set the working directory inside the builder container
 WORKDIR /app
@@ -19,7 +19,7 @@ RUN apt-get update && apt-get install -y --no-install-recommends build-essential
 
 # ----------- Stage 2: Final runtime image --------------
 # Use the same slim Python base image for the final runtime
-FROM python:3.9.18-slim-bullseye
+FROM python:3.12-slim-bookworm
 
 # Set the working directory inside the final container
 WORKDIR /app
@@ -42,6 +42,9 @@ USER cloudromuser
 
 # Command to run the Gunicorn server.
 # --bind 0.0.0.0:8080: Binds the server to all network interfaces on port 8080.
-# --workers 4: Configures 4 worker processes for handling requests.
+# --workers 2: Configures 2 worker processes for handling requests.
+# --worker-class gthread --threads 32: Each worker serves 32 requests concurrently; the endpoints
+#   spend most of their time waiting on cloud API calls, so threads keep the CPUs busy.
+# --worker-tmp-dir /dev/shm: Keeps the worker heartbeat file in memory instead of on disk.
 # main:app: Specifies that Gunicorn should run the 'app' Flask application from 'main.py'.
-CMD ["gunicorn", "--bind", "0.0.0.0:8080", "--workers", "4", "main:app"]
+CMD ["gunicorn", "--bind", "0.0.0.0:8080", "--workers", "2", "--worker-class", "gthread", "--threads", "32", "--worker-tmp-dir", "/dev/shm", "main:app"]
@@ -2,18 +2,81 @@
 import os
 import sys
 import requests
+import orjson
 import signal
+import threading
+import time
+from functools import wraps
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from errno import ENOENT, EIO
 from fuse import FUSE, Operations, FuseOSError
-from cachetools import TTLCache, cached
+from cachetools import LRUCache, TTLCache
 import logging # Import the logging module
+import logging.handlers
+import queue
+import atexit
 
 # Configure logging for the FUSE client for better visibility
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [cloudfs_fuse] %(levelname)s: %(message)s')
 
-# Caches for metadata (short TTL for freshness) and file data (longer TTL for performance)
-metadata_cache = TTLCache(maxsize=1024, ttl=60)  # 1 min cache on metadata
-data_cache = TTLCache(maxsize=8192, ttl=300)     # 5 min cache on file data
+# Hand log records to a background thread so FUSE/request threads never block on stderr writes
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+logging.getLogger().handlers = [logging.handlers.QueueHandler(log_queue)]
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# File data is cached in fixed, aligned blocks so overlapping/adjacent FUSE reads share one fetch
+BLOCK_SIZE = 1 << 20  # 1 MiB
+
+# Metadata entries are keyed on a coarse monotonic-clock epoch instead of carrying per-entry
+# timers: a new epoch every METADATA_TTL seconds makes older entries unreachable, and the LRU evicts them
+METADATA_TTL = 60
+
+# Caches for metadata (short TTL for freshness) and file data (LRU bounded by bytes; objects are immutable)
+metadata_cache = LRUCache(maxsize=2048)          # <=1 min cache on metadata, keyed by (op, path, epoch)
+metadata_lock = threading.Lock()
+data_cache = LRUCache(maxsize=256 * BLOCK_SIZE, getsizeof=len)  # 256 MiB of file data, keyed by (path, block index)
+url_cache = TTLCache(maxsize=1024, ttl=240)      # 4 min cache on presigned URLs (backend URLs have at least 5 min left)
+url_lock = threading.Lock()
+
+def metadata_epoch():
+    """Current metadata cache epoch; changes every METADATA_TTL seconds."""
+    return int(time.monotonic()) // METADATA_TTL
+
+def epoch_cached(func):
+    """Memoize a CloudFS metadata operation under (operation name, path, epoch)."""
+    @wraps(func)
+    def wrapper(self, path, *args):
+        key = (func.__name__, path, metadata_epoch())
+        with metadata_lock:
+            value = metadata_cache.get(key)
+        if value is not None:
+            return value
+        value = func(self, path, *args)
+        with metadata_lock:
+            metadata_cache[key] = value
+        return value
+    return wrapper
+
+# Block-cache hit/miss counters, logged every DATA_CACHE_STATS_INTERVAL seconds to show whether
+# data_cache is sized for the working set. Callers update them while holding the data_cache lock.
+DATA_CACHE_STATS_INTERVAL = 300
+data_cache_stats = {'hits': 0, 'misses': 0, 'since': time.monotonic()}
+
+def note_data_cache_lookup(hit):
+    """Count one block lookup and log the hit ratio once per DATA_CACHE_STATS_INTERVAL."""
+    data_cache_stats['hits' if hit else 'misses'] += 1
+    now = time.monotonic()
+    if now - data_cache_stats['since'] < DATA_CACHE_STATS_INTERVAL:
+        return
+    hits, misses = data_cache_stats['hits'], data_cache_stats['misses']
+    logging.info("data_cache: %.1f%% hit ratio over %d block lookups, %d of %d MiB in use",
+                 100.0 * hits / (hits + misses), hits + misses,
+                 data_cache.currsize >> 20, data_cache.maxsize >> 20)
+    data_cache_stats.update(hits=0, misses=0, since=now)
 
 class CloudFS(Operations):
     """
@@ -27,6 +90,17 @@ class CloudFS(Operations):
         self.session.headers.update({'Authorization': f'Bearer {token}'})
         # Verify SSL certificates for secure communication
         self.session.verify = True
+        # Separate pooled session for presigned S3 URLs: reuses TCP/TLS connections across
+        # reads and never carries the backend's Authorization header
+        self.s3_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                              max_retries=Retry(total=2, backoff_factor=0.1))
+        self.s3_session.mount('https://', adapter)
+        self.s3_session.mount('http://', adapter)
+        # Background read-ahead of the next block; _inflight maps (path, index) -> Future
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cloudfs-prefetch')
+        self._inflight = {}
+        self._lock = threading.Lock() # Guards _inflight and data_cache across FUSE/prefetch threads
         logging.info(f"CloudFS initialized with backend endpoint: {self.endpoint}")
 
     def _api_request(self, method, path, **kwargs):
@@ -35,7 +109,7 @@ class CloudFS(Operations):
         try:
             resp = self.session.request(method, url, timeout=10, **kwargs)
             resp.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            return resp.json()
+            return orjson.loads(resp.content)
         except requests.exceptions.HTTPError as e:
             logging.error(f"API HTTP error {e.response.status_code} for {url}: {e.response.text}")
             if e.response.status_code == 404:
@@ -49,13 +123,13 @@ class CloudFS(Operations):
             logging.critical(f"Unexpected error during API request to {url}: {e}")
             raise FuseOSError(EIO)
 
-    @cached(metadata_cache)
+    @epoch_cached
     def getattr(self, path, fh=None):
         """
         Get file/directory attributes.
         This method is called for every path lookup.
         """
-        logging.debug(f"getattr called for path: {path}")
+        logging.debug("getattr called for path: %s", path)
         if path == '/':
             # Root directory attributes
             return dict(st_mode=(0o040755), st_nlink=2, st_size=4096)
@@ -63,15 +137,7 @@ class CloudFS(Operations):
         try:
             # Fetch attributes from the backend API
             attrs = self._api_request('GET', '/cloudfs/attrs', params={'path': path})
-            # Coerce types safely, providing default values if keys are missing
-            return {
-                'st_mode': int(attrs.get('st_mode', 0)),
-                'st_nlink': int(attrs.get('st_nlink', 1)),
-                'st_size': int(attrs.get('st_size', 0)),
-                'st_ctime': float(attrs.get('st_ctime', 0)),
-                'st_mtime': float(attrs.get('st_mtime', 0)),
-                'st_atime': float(attrs.get('st_atime', 0)),
-            }
+            return self._coerce_attrs(attrs)
         except FuseOSError:
             # Re-raise FuseOSError if already raised by _api_request
             raise
@@ -79,15 +145,35 @@ class CloudFS(Operations):
             logging.error(f"Metadata format or unexpected error for {path}: {e}")
             raise FuseOSError(EIO)
 
-    @cached(metadata_cache)
+    @staticmethod
+    def _coerce_attrs(attrs):
+        """Coerce backend attrs to stat types safely, providing default values if keys are missing."""
+        return {
+            'st_mode': int(attrs.get('st_mode', 0)),
+            'st_nlink': int(attrs.get('st_nlink', 1)),
+            'st_size': int(attrs.get('st_size', 0)),
+            'st_ctime': float(attrs.get('st_ctime', 0)),
+            'st_mtime': float(attrs.get('st_mtime', 0)),
+            'st_atime': float(attrs.get('st_atime', 0)),
+        }
+
+    @epoch_cached
     def readdir(self, path, fh):
         """
         List contents of a directory.
         Returns a list of names of files and subdirectories.
+        Per-entry attrs returned with the listing are stored under getattr's
+        cache key so the follow-up getattr calls (e.g. from ls -l) are cache hits.
         """
-        logging.debug(f"readdir called for path: {path}")
+        logging.debug("readdir called for path: %s", path)
         try:
-            resp = self._api_request('GET', '/cloudfs/list', params={'path': path})
+            resp = self._api_request('GET', '/cloudfs/list', params={'path': path, 'attrs': 1})
+            parent = path.rstrip('/')
+            epoch = metadata_epoch()
+            primed = {('getattr', f"{parent}/{name}", epoch): self._coerce_attrs(attrs)
+                      for name, attrs in resp.get('attrs', {}).items()}
+            with metadata_lock:
+                metadata_cache.update(primed)
             # FUSE expects '.' and '..' entries for directories
             return ['.', '..'] + resp.get('dirs', []) + resp.get('files', [])
         except FuseOSError:
@@ -96,36 +182,128 @@ class CloudFS(Operations):
             logging.error(f"Error reading directory {path}: {e}")
             raise FuseOSError(EIO)
 
+    def _presigned_url(self, path):
+        """Returns a presigned URL for path, reusing a cached one while it is still valid."""
+        with url_lock:
+            presigned_url = url_cache.get(path)
+        if presigned_url:
+            return presigned_url
+        url_json = self._api_request('GET', '/cloudfs/file', params={'path': path})
+        presigned_url = url_json.get('url')
+        if not presigned_url:
+            logging.error(f"No presigned URL received for {path}")
+            raise FuseOSError(EIO)
+        with url_lock:
+            url_cache[path] = presigned_url
+        return presigned_url
+
+    def _fetch_block(self, path, index):
+        """
+        Fetch one BLOCK_SIZE-aligned block of a file and store it in data_cache.
+        The last block of a file may be shorter than BLOCK_SIZE.
+        """
+        key = (path, index)
+        with self._lock:
+            block = data_cache.get(key)
+            pending = self._inflight.get(key)
+            note_data_cache_lookup(block is not None)
+            if block is None and pending is None:
+                # First miss on this block: publish a future so concurrent readers wait on this fetch
+                self._inflight[key] = leader = Future()
+        if block is not None:
+            return block
+        if pending is not None:
+            # A fetch for this block is already running; wait for it instead of fetching twice
+            try:
+                return pending.result()
+            except Exception as e:
+                logging.debug(f"In-flight fetch of block {index} for {path} failed, refetching: {e}")
+            return self._download_block(path, index)
+        try:
+            block = self._download_block(path, index)
+        except Exception as e:
+            leader.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        leader.set_result(block)
+        return block
+
+    def _download_block(self, path, index):
+        """Issue the ranged GET for one block and store the result in data_cache."""
+        key = (path, index)
+        start = index * BLOCK_SIZE
+        # Request the whole block using the 'Range' header; stream so headers can be checked before the body
+        headers = {'Range': f'bytes={start}-{start + BLOCK_SIZE - 1}', 'Accept-Encoding': 'gzip'}
+        s3_resp = self.s3_session.get(self._presigned_url(path), headers=headers, timeout=30, stream=True)
+        if s3_resp.status_code == 416:
+            # Range starts past end of file
+            s3_resp.close()
+            block = b''
+        else:
+            s3_resp.raise_for_status() # Raise HTTPError for bad responses
+            if s3_resp.headers.get('Content-Encoding') == 'gzip':
+                # Stored gzip-encoded: the range addresses stored bytes and getattr reports the stored
+                # size, so serve those bytes as-is; decoding would not line up with either
+                with s3_resp:
+                    block = s3_resp.raw.read(decode_content=False)
+            else:
+                block = s3_resp.content
+        with self._lock:
+            data_cache[key] = block
+        logging.debug("Fetched block %d (%d bytes) for %s", index, len(block), path)
+        return block
+
+    def _prefetch(self, path, index):
+        """Schedule a background fetch of block index unless it is cached or already in flight."""
+        key = (path, index)
+        with self._lock:
+            if key in data_cache or key in self._inflight:
+                return
+            self._inflight[key] = self._pool.submit(self._prefetch_block, path, index)
+
+    def _prefetch_block(self, path, index):
+        """Worker body for _prefetch; errors are left for the foreground read to surface."""
+        try:
+            return self._download_block(path, index)
+        finally:
+            with self._lock:
+                self._inflight.pop((path, index), None)
+
     def read(self, path, size, offset, fh):
         """
         Read data from a file.
+        Served from whole cached blocks; only missing blocks hit S3.
         """
-        logging.debug(f"read called for path: {path}, size: {size}, offset: {offset}")
+        logging.debug("read called for path: %s, size: %d, offset: %d", path, size, offset)
         if size <= 0:
             return b'' # Return empty bytes if size is non-positive
 
-        key = (path, offset, size)
-        if key in data_cache:
-            logging.debug(f"Cache hit for {path} at offset {offset}, size {size}")
-            return data_cache[key]
-
+        first = offset // BLOCK_SIZE
+        last = (offset + size - 1) // BLOCK_SIZE
         try:
-            url_json = self._api_request('GET', '/cloudfs/file', params={'path': path})
-            presigned_url = url_json.get('url')
-            if not presigned_url:
-                logging.error(f"No presigned URL received for {path}")
-                raise FuseOSError(EIO)
-
-            # Request specific byte range using the 'Range' header
-            headers = {'Range': f'bytes={offset}-{offset + size - 1}'}
-            s3_resp = requests.get(presigned_url, headers=headers, timeout=30)
-            s3_resp.raise_for_status() # Raise HTTPError for bad responses
-            data = s3_resp.content
-            data_cache[key] = data # Cache the fetched data block
-            logging.debug(f"Successfully read {len(data)} bytes for {path} at offset {offset}")
+            chunks = []
+            for index in range(first, last + 1):
+                block = self._fetch_block(path, index)
+                chunks.append(block)
+                if len(block) < BLOCK_SIZE:
+                    break # Short block means end of file
+            else:
+                # Last block was full, so the file may continue: read ahead while the kernel consumes this one
+                self._prefetch(path, last + 1)
+            data = b''.join(chunks)
+            start = offset - first * BLOCK_SIZE
+            data = data[start:start + size]
+            logging.debug("Successfully read %d bytes for %s at offset %d", len(data), path, offset)
             return data
         except FuseOSError:
             raise # Re-raise FuseOSError if already raised by _api_request
+        except requests.exceptions.HTTPError as e:
+            logging.error(f"S3 presigned URL HTTP error {e.response.status_code} for {path}")
+            if e.response.status_code == 404:
+                raise FuseOSError(ENOENT) # Object missing; the backend no longer checks before signing
+            raise FuseOSError(EIO)
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to read from S3 presigned URL for {path}: {e}")
             raise FuseOSError(EIO)
@@ -186,11 +364,6 @@ class CloudFS(Operations):
         logging.debug(f"release called for path: {path}")
         return 0
 
-def signal_handler(signum, frame):
-    """Handles termination signals for graceful unmounting."""
-    logging.info("Received termination signal, unmounting...")
-    sys.exit(0)
-
 if __name__ == "__main__":
     # Retrieve environment variables for backend URL, token, and mountpoint
     backend_url = os.environ.get("CLOUDROM_BACKEND")
@@ -202,23 +375,25 @@ if __name__ == "__main__":
         logging.critical("Missing required environment variables: CLOUDROM_BACKEND and TOKEN. Exiting.")
         sys.exit(1)
 
-    # Create mountpoint directory if it does not exist
-    if not os.path.exists(mountpoint):
-        try:
-            os.makedirs(mountpoint)
-            logging.info(f"Created mountpoint directory: {mountpoint}")
-        except OSError as e:
-            logging.critical(f"Failed to create mountpoint directory {mountpoint}: {e}. Exiting.")
-            sys.exit(1)
+    # Create mountpoint directory (no-op if it already exists)
+    try:
+        os.makedirs(mountpoint, exist_ok=True)
+    except OSError as e:
+        logging.critical(f"Failed to create mountpoint directory {mountpoint}: {e}. Exiting.")
+        sys.exit(1)
 
-    # Register signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Leave termination signals at their default disposition so libfuse installs its own
+    # async-signal-safe handlers, which exit the FUSE loop and unmount. A Python handler would
+    # never run here: the main thread stays blocked inside fuse_main until the loop ends.
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
 
     logging.info(f"Mounting CloudFS at {mountpoint}...")
     try:
-        # Initialize and run FUSE filesystem
-        FUSE(CloudFS(backend_url, token), mountpoint, foreground=True, nothreads=False)
+        # Initialize and run FUSE filesystem. The mount is read-only, so the kernel may keep
+        # lookups and attributes for an hour (misses for 10s) instead of asking us every second
+        FUSE(CloudFS(backend_url, token), mountpoint, foreground=True, nothreads=False, ro=True,
+             attr_timeout=3600, entry_timeout=3600, negative_timeout=10)
     except Exception as e:
         logging.critical(f"Failed to mount FUSE filesystem at {mountpoint}: {e}. Exiting.")
         sys.exit(1)
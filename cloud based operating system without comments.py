@@ -2,12 +2,27 @@ import os
 import sys
 import subprocess
 import logging
+import re
 import uuid
+import time
+import datetime
+import threading
+import logging.handlers
+import queue
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Configure logging early for setup messages
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger()
 
+# Hand log records to a background thread so FUSE/request threads never block on stderr writes
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+log_listener.start()
+atexit.register(log_listener.stop)
+
 # --- Automatic Environment Setup ---
 def set_default_environment():
     """Set default environment variables if not already set"""
@@ -29,23 +44,37 @@ def set_default_environment():
 
 # --- Silent Dependency Installation ---
 def install_dependencies():
-    """Install required Python packages if missing"""
+    """
+    Install required Python packages if missing.
+    Checks for each package's import module instead of scanning installed
+    distributions; set SKIP_DEPENDENCY_INSTALL=1 where dependencies are baked in.
+    """
+    if os.environ.get("SKIP_DEPENDENCY_INSTALL", "").lower() in ("1", "true"):
+        return
+    # (import module, pip package)
     required_packages = [
-        "google-api-core",
-        "google-cloud-storage",
-        "google-cloud-datastore",
-        "google-cloud-secret-manager",
-        "flask",
-        "requests",
-        "pyjwt",
-        "cachetools",
-        "fusepy"
+        ("google.api_core", "google-api-core"),
+        ("google.cloud.storage", "google-cloud-storage"),
+        ("google.cloud.datastore", "google-cloud-datastore"),
+        ("google.cloud.secretmanager", "google-cloud-secret-manager"),
+        ("flask", "flask"),
+        ("requests", "requests"),
+        ("jwt", "pyjwt"),
+        ("cachetools", "cachetools"),
+        ("fuse", "fusepy"),
+        ("orjson", "orjson")
     ]
     
     try:
-        import pkg_resources
-        installed = {pkg.key for pkg in pkg_resources.working_set}
-        missing = [pkg for pkg in required_packages if pkg.lower() not in installed]
+        import importlib.util
+        missing = []
+        for module, package in required_packages:
+            try:
+                found = importlib.util.find_spec(module) is not None
+            except ImportError:
+                found = False # Parent package (e.g. google.cloud) is missing
+            if not found:
+                missing.append(package)
         
         if missing:
             logger.info(f"Installing {len(missing)} missing dependencies...")
@@ -70,11 +99,17 @@ try:
     from google.cloud import storage
     from google.cloud import datastore
     from google.cloud import secretmanager
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
     import requests
+    from requests.adapters import HTTPAdapter
     import jwt
-    from functools import wraps
+    import orjson
+    from functools import wraps, lru_cache
     from flask import Flask, request, jsonify, abort
-    from cachetools import cached, TTLCache
+    from flask.json.provider import JSONProvider
+    from cachetools import cached, LRUCache, TTLCache
+    from cachetools.keys import hashkey
     from errno import ENOENT, EIO
     from fuse import FUSE, Operations, FuseOSError
 except ImportError as e:
@@ -82,8 +117,22 @@ except ImportError as e:
     sys.exit(1)
 
 # --- Backend Application (Flask) ---
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Serialize straight to bytes, skipping the str round-trip of dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 # Initialize the Flask application
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Get environment variables
 GCP_PROJECT_ID = os.environ["GCP_PROJECT_ID"]
@@ -98,10 +147,27 @@ logger.info(f"GCS Bucket Name: {GCS_BUCKET_NAME}")
 logger.info(f"Datastore Kind: {DATASTORE_KIND}")
 logger.info(f"JWT Secret ID: {JWT_SECRET_ID}")
 
+def make_authorized_session(scopes):
+    """
+    Builds an AuthorizedSession with a larger keep-alive pool, so concurrent
+    request threads reuse TLS connections to Google APIs instead of re-handshaking.
+    Returns (credentials, session): clients given a custom _http skip google.auth.default(),
+    so the credentials must be passed alongside it for URL signing to work.
+    """
+    credentials, _ = google.auth.default(scopes=scopes)
+    session = AuthorizedSession(credentials, refresh_status_codes=(401,))
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+    session.mount('https://', adapter)
+    return credentials, session
+
 # Initialize Google Cloud clients
 try:
-    storage_client = storage.Client(project=GCP_PROJECT_ID)
-    datastore_client = datastore.Client(project=GCP_PROJECT_ID)
+    storage_credentials, storage_session = make_authorized_session(storage.Client.SCOPE)
+    storage_client = storage.Client(project=GCP_PROJECT_ID, credentials=storage_credentials, _http=storage_session)
+    # Single Bucket handle shared by all requests
+    gcs_bucket = storage_client.bucket(GCS_BUCKET_NAME)
+    # gRPC: one multiplexed HTTP/2 connection and protobuf payloads for register()'s get/put
+    datastore_client = datastore.Client(project=GCP_PROJECT_ID, _use_grpc=True)
     secret_manager_client = secretmanager.SecretManagerServiceClient()
     logger.info("Google Cloud clients initialized successfully")
 except Exception as e:
@@ -111,7 +177,7 @@ except Exception as e:
 # Cache for the JWT secret, to reduce API calls
 secret_cache = TTLCache(maxsize=1, ttl=300)
 
-@cached(secret_cache)
+@cached(secret_cache, lock=threading.Lock())
 def get_jwt_secret():
     """Retrieves the JWT secret from Google Cloud Secret Manager with local fallback."""
     try:
@@ -126,22 +192,46 @@ def get_jwt_secret():
             raise
         return fallback
 
+@lru_cache(maxsize=4)
+def _jwt_key_bytes(secret):
+    return secret.encode('utf-8')
+
+def get_jwt_key():
+    """
+    Returns the JWT secret as bytes, ready for PyJWT's HMAC key.
+    The encoded key is derived once per secret value, so a rotation picks up a new key.
+    """
+    return _jwt_key_bytes(get_jwt_secret())
+
+# Cache of already-verified tokens: raw token -> (device_id, exp or None)
+token_cache = TTLCache(maxsize=4096, ttl=60)
+token_cache_lock = threading.Lock()
+
 def token_required(f):
-    """A decorator to validate JWT tokens from the 'Authorization' header."""
+    """
+    A decorator to validate JWT tokens from the 'Authorization' header.
+    Verified tokens are cached briefly so repeat requests skip jwt.decode().
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
         auth_header = request.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
             app.logger.warning("Authorization header missing or malformed.")
             abort(401, "Authorization header required with Bearer token.")
-        token = auth_header.split(' ')[-1]
+        token = auth_header[7:].strip()
         if not token:
             app.logger.warning("Authorization token is empty.")
             abort(401, "Authorization token missing.")
+        with token_cache_lock:
+            hit = token_cache.get(token)
+        if hit is not None and (hit[1] is None or hit[1] > time.time()):
+            request.device_id = hit[0]
+            return f(*args, **kwargs)
         try:
-            secret = get_jwt_secret()
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
+            payload = jwt.decode(token, get_jwt_key(), algorithms=['HS256'])
             request.device_id = payload['device_id']
+            with token_cache_lock:
+                token_cache[token] = (payload['device_id'], payload.get('exp'))
         except jwt.ExpiredSignatureError:
             app.logger.warning("Token expired.")
             abort(401, "Token expired.")
@@ -154,10 +244,16 @@ def token_required(f):
         return f(*args, **kwargs)
     return decorated
 
+# Paths made only of plain segments (no '.'/'..' segments, empty segments or trailing '/')
+# are already normal; normalize_path returns them without going through os.path.normpath
+_SAFE_PATH_RE = re.compile(r'/?[A-Za-z0-9_-][A-Za-z0-9._-]*(?:/[A-Za-z0-9_-][A-Za-z0-9._-]*)*')
+
 def normalize_path(path):
     """Normalizes a path to prevent directory traversal attacks."""
     if not path:
         return ''
+    if _SAFE_PATH_RE.fullmatch(path):
+        return path.lstrip('/')
     normalized = os.path.normpath(path).lstrip(os.sep)
     if normalized.startswith('..') or normalized.startswith('./..'):
         app.logger.warning(f"Attempted path traversal detected: {path}")
@@ -188,8 +284,7 @@ def register():
         abort(500, "Device registration failed.")
 
     try:
-        secret = get_jwt_secret()
-        token = jwt.encode({'device_id': device_id}, secret, algorithm='HS256')
+        token = jwt.encode({'device_id': device_id}, get_jwt_key(), algorithm='HS256')
         return jsonify({'token': token})
     except Exception as e:
         app.logger.error(f"Token generation failed for device {device_id}: {e}")
@@ -201,9 +296,8 @@ def latest_image():
     """Generates a signed URL for the latest image."""
     image_key = "rootfs.img"
     try:
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(image_key)
-        url = blob.generate_signed_url(expiration=3600) # URL expires in 1 hour
+        blob = gcs_bucket.blob(image_key)
+        url = blob.generate_signed_url(expiration=datetime.timedelta(hours=1)) # URL expires in 1 hour
         app.logger.info(f"Generated signed URL for {image_key} for device {request.device_id}.")
         return jsonify({'url': url})
     except NotFound:
@@ -213,30 +307,100 @@ def latest_image():
         app.logger.critical(f"Unexpected error retrieving latest image: {e}")
         abort(500, "Internal server error.")
 
+def blob_attrs(blob):
+    """Builds the stat dict for a file blob from metadata already on the Blob object."""
+    return {
+        'st_mode': 0o100644,
+        'st_nlink': 1,
+        'st_size': blob.size,
+        'st_ctime': blob.time_created.timestamp(),
+        'st_mtime': blob.updated.timestamp(),
+        'st_atime': blob.updated.timestamp(),
+    }
+
+DIR_ATTRS = dict(st_mode=0o040755, st_nlink=2, st_size=4096)
+
+# Server-side stat cache for /cloudfs/attrs, keyed by normalized path. Paths found missing
+# are remembered separately for a shorter time so a burst of probes costs one GCS lookup.
+stat_cache = TTLCache(maxsize=4096, ttl=60)
+missing_stat_cache = TTLCache(maxsize=8192, ttl=10)
+stat_lock = threading.Lock()
+
+@cached(stat_cache, lock=stat_lock)
+def load_attrs(path):
+    """Returns the stat dict for a non-root path; raises NotFound if nothing exists there."""
+    with stat_lock:
+        if path in missing_stat_cache:
+            raise NotFound(f"{path} not found (cached)")
+    try:
+        # Check if it's a directory by looking for objects with the path as a prefix
+        prefix = path + '/' if not path.endswith('/') else path
+        blobs = gcs_bucket.list_blobs(prefix=prefix, max_results=1, retry=DEFAULT_RETRY)
+        if any(blobs):
+            return DIR_ATTRS
+        # If not a directory, assume it's a file and get its attributes
+        blob = gcs_bucket.blob(path)
+        blob.reload()
+        return blob_attrs(blob)
+    except NotFound:
+        with stat_lock:
+            missing_stat_cache[path] = True
+        raise
+
 @app.route('/cloudfs/list', methods=['GET'])
 @token_required
 def list_dir():
-    """Lists files and directories in a given path in Cloud Storage."""
+    """
+    Lists files and directories in a given path in Cloud Storage.
+    With ?attrs=1 the response also carries a stat dict per entry, taken
+    from the listing itself, so clients can skip per-entry attrs calls.
+    """
     path = normalize_path(request.args.get('path', ''))
     # Ensure path ends with a '/' for consistent listing
     if path and not path.endswith('/'):
         path += '/'
+    want_attrs = request.args.get('attrs') == '1'
     app.logger.info(f"Listing directory {path} for device {request.device_id}.")
     try:
         # List blobs with a prefix and delimiter to simulate directories
-        blobs = storage_client.list_blobs(GCS_BUCKET_NAME, prefix=path, delimiter='/')
+        blobs = gcs_bucket.list_blobs(prefix=path, delimiter='/')
         
-        # Get sub-directories from the prefixes
-        dirs = [d.rstrip('/').split('/')[-1] for d in blobs.prefixes]
+        # Get files from the blobs; this pages through the listing and fills blobs.prefixes
+        if want_attrs:
+            files, attrs = [], {}
+            for blob in blobs:
+                if blob.name != path:
+                    name = blob.name.rpartition('/')[2]
+                    files.append(name)
+                    attrs[name] = blob_attrs(blob)
+        else:
+            files = [blob.name.rpartition('/')[2] for blob in blobs if blob.name != path]
         
-        # Get files from the blobs
-        files = [blob.name.split('/')[-1] for blob in blobs if blob.name != path]
+        # Get sub-directories from the prefixes (each ends with exactly one '/')
+        dirs = [d[:-1].rpartition('/')[2] for d in blobs.prefixes]
         
-        return jsonify({'dirs': dirs, 'files': files})
+        body = {'dirs': dirs, 'files': files}
+        if want_attrs:
+            attrs.update((d, DIR_ATTRS) for d in dirs)
+            body['attrs'] = attrs
+            # The listing already has every child's stat; prime load_attrs' cache with it
+            with stat_lock:
+                stat_cache.update((hashkey(path + name), a) for name, a in attrs.items())
+        return jsonify(body)
     except Exception as e:
         app.logger.error(f"Cloud Storage list directory failed for path {path}: {e}")
         abort(500, "Failed to list directory.")
 
+# Signed URLs per object path. They are issued for 15 minutes and reused for 10,
+# so every URL handed out stays valid for at least 5 more minutes (clients cache them for 4)
+SIGNED_URL_EXPIRATION = 900
+signed_url_cache = TTLCache(maxsize=4096, ttl=600)
+
+@cached(signed_url_cache, lock=threading.Lock())
+def signed_file_url(path):
+    """Signs a GET URL for an object; cached so repeat reads skip the signing step."""
+    return gcs_bucket.blob(path).generate_signed_url(expiration=datetime.timedelta(seconds=SIGNED_URL_EXPIRATION))
+
 @app.route('/cloudfs/file', methods=['GET'])
 @token_required
 def get_file():
@@ -247,15 +411,9 @@ def get_file():
         abort(400, "Missing 'path' parameter.")
     app.logger.info(f"Retrieving file URL for {path} for device {request.device_id}.")
     try:
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(path)
-        
-        # Check if the blob exists first to handle 404
-        if not blob.exists():
-            app.logger.info(f"File not found: {path}")
-            abort(404, "File not found.")
-            
-        url = blob.generate_signed_url(expiration=300) # URL expires in 5 minutes
+        # No existence probe: signing is local, and a missing object
+        # surfaces as a 404 when the client fetches the signed URL
+        url = signed_file_url(path)
         return jsonify({'url': url})
     except Exception as e:
         app.logger.error(f"Cloud Storage get file URL failed for {path}: {e}")
@@ -274,31 +432,8 @@ def get_attrs():
     try:
         if path in ('', '/'):
             # Root directory attributes
-            return jsonify(dict(st_mode=0o040755, st_nlink=2, st_size=4096))
-
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        
-        # Check if it's a directory by looking for objects with the path as a prefix
-        prefix = path + '/' if not path.endswith('/') else path
-        blobs = storage_client.list_blobs(GCS_BUCKET_NAME, prefix=prefix, max_results=1, retry=DEFAULT_RETRY)
-        
-        # Check if any blobs exist with that prefix
-        if any(blobs):
-            return jsonify(dict(st_mode=0o040755, st_nlink=2, st_size=4096))
-        
-        # If not a directory, assume it's a file and get its attributes
-        blob = bucket.blob(path)
-        blob.reload()
-        
-        attrs = {
-            'st_mode': 0o100644,
-            'st_nlink': 1,
-            'st_size': blob.size,
-            'st_ctime': blob.time_created.timestamp(),
-            'st_mtime': blob.updated.timestamp(),
-            'st_atime': blob.updated.timestamp(),
-        }
-        return jsonify(attrs)
+            return jsonify(DIR_ATTRS)
+        return jsonify(load_attrs(path))
     except NotFound:
         app.logger.info(f"File or directory not found: {path}")
         abort(404, "File or directory not found.")
@@ -310,18 +445,64 @@ def get_attrs():
 @token_required
 def report_health():
     """Receives a health report from the client."""
-    app.logger.info(f"Health report from device {request.device_id}: {request.json}")
-    return "OK", 200
+    # The report is only logged, so log the raw body rather than parsing it as JSON
+    app.logger.info("Health report from device %s: %s", request.device_id, request.get_data(as_text=True))
+    return ok_response()
+
+# Polled endpoints answer with a body encoded once at import; building the Response directly
+# skips Flask's return-value coercion (a fresh object per request, since hooks may mutate it)
+_OK_BYTES = b"OK"
+
+def ok_response():
+    return app.response_class(_OK_BYTES, mimetype='text/plain')
 
 @app.route('/', methods=['GET'])
 def health_check():
     """A simple health check endpoint."""
-    return "OK", 200
+    return ok_response()
 
 # --- FUSE Client ---
-# Caching for metadata and data
+# Caching for metadata and data. cachetools caches are not thread-safe and FUSE runs ops on
+# several threads, so every access holds the matching lock; HTTP calls never do.
+# getattr results live in metadata_cache and readdir results in listing_cache, both keyed on the
+# interned path alone (one CloudFS per process) so lookups skip building a hashkey tuple.
 metadata_cache = TTLCache(maxsize=1024, ttl=60)
-data_cache = TTLCache(maxsize=4096, ttl=300)
+listing_cache = TTLCache(maxsize=1024, ttl=60)
+metadata_lock = threading.RLock()
+
+def path_key(self, path, fh=None):
+    """Cache key for CloudFS.getattr/readdir: the interned path, ignoring self and fh."""
+    return sys.intern(path)
+
+# Paths getattr found missing; @cached never stores exceptions, so without this every
+# probe of a nonexistent path (shell completion, indexers) goes to the backend.
+negative_cache = TTLCache(maxsize=8192, ttl=10)
+# File data is cached in aligned blocks keyed on (path, block index), so reads at any
+# offset/size the kernel picks share the same entries. maxsize is in bytes (getsizeof=len).
+BLOCK_SIZE = 1 << 20  # 1 MiB
+data_cache = LRUCache(maxsize=256 * BLOCK_SIZE, getsizeof=len)
+data_lock = threading.RLock()
+READAHEAD_BLOCKS = 4  # blocks fetched ahead of a sequential reader
+# Presigned URLs per path; the backend's URLs stay valid for at least 5 more minutes when handed out
+url_cache = TTLCache(maxsize=1024, ttl=240)
+url_lock = threading.Lock()
+
+# Block-cache hit/miss counters, logged every DATA_CACHE_STATS_INTERVAL seconds to show whether
+# data_cache is sized for the working set. Callers update them while holding the data_cache lock.
+DATA_CACHE_STATS_INTERVAL = 300
+data_cache_stats = {'hits': 0, 'misses': 0, 'since': time.monotonic()}
+
+def note_data_cache_lookup(hit):
+    """Count one block lookup and log the hit ratio once per DATA_CACHE_STATS_INTERVAL."""
+    data_cache_stats['hits' if hit else 'misses'] += 1
+    now = time.monotonic()
+    if now - data_cache_stats['since'] < DATA_CACHE_STATS_INTERVAL:
+        return
+    hits, misses = data_cache_stats['hits'], data_cache_stats['misses']
+    logging.info("data_cache: %.1f%% hit ratio over %d block lookups, %d of %d MiB in use",
+                 100.0 * hits / (hits + misses), hits + misses,
+                 data_cache.currsize >> 20, data_cache.maxsize >> 20)
+    data_cache_stats.update(hits=0, misses=0, since=now)
 
 class CloudFS(Operations):
     """
@@ -333,6 +514,19 @@ class CloudFS(Operations):
         self.session = requests.Session()
         self.session.headers.update({'Authorization': f'Bearer {token}'})
         self.session.verify = True
+        # Pooled session for signed blob URLs; kept apart from self.session so the
+        # Bearer token is never sent to Cloud Storage
+        self.blob_session = requests.Session()
+        self.blob_session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
+        atexit.register(self.blob_session.close)
+        # Block fetches in flight, foreground or read-ahead, as (path, index) -> Future in _inflight;
+        # concurrent misses on one block wait on the first fetch instead of downloading it again.
+        # _last_end remembers where recently read files' previous read stopped to detect sequential
+        # access; it is an LRU so a long-running mount walking many files does not grow it forever.
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cloudfs-prefetch')
+        self._inflight = {}
+        self._last_end = LRUCache(maxsize=4096)
+        atexit.register(self._prefetch_pool.shutdown, wait=False, cancel_futures=True)
         logging.info(f"CloudFS initialized with backend endpoint: {self.endpoint}")
 
     def _api_request(self, method, path, **kwargs):
@@ -341,7 +535,7 @@ class CloudFS(Operations):
         try:
             resp = self.session.request(method, url, timeout=10, **kwargs)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except requests.exceptions.HTTPError as e:
             logging.error(f"API HTTP error for {url}: {e.response.status_code} - {e.response.text}")
             if e.response.status_code == 404:
@@ -354,40 +548,137 @@ class CloudFS(Operations):
             logging.critical(f"Unexpected error during API request to {url}: {e}")
             raise FuseOSError(EIO)
 
-    @cached(metadata_cache)
+    @cached(metadata_cache, key=path_key, lock=metadata_lock)
     def getattr(self, path, fh=None):
-        logging.debug(f"getattr called for path: {path}")
+        logging.debug("getattr called for path: %s", path)
         if path == '/':
             return dict(st_mode=(0o040755), st_nlink=2, st_size=4096)
-        return self._api_request('GET', '/cloudfs/attrs', params={'path': path})
+        with metadata_lock:
+            if path in negative_cache:
+                raise FuseOSError(ENOENT)
+        try:
+            return self._api_request('GET', '/cloudfs/attrs', params={'path': path})
+        except FuseOSError as e:
+            if e.errno == ENOENT:
+                with metadata_lock:
+                    negative_cache[path] = True
+            raise
 
-    @cached(metadata_cache)
+    @cached(listing_cache, key=path_key, lock=metadata_lock)
     def readdir(self, path, fh):
-        logging.debug(f"readdir called for path: {path}")
-        resp = self._api_request('GET', '/cloudfs/list', params={'path': path})
+        logging.debug("readdir called for path: %s", path)
+        resp = self._api_request('GET', '/cloudfs/list', params={'path': path, 'attrs': 1})
+        # Prime getattr's cache entries under the same key path_key gives getattr
+        parent = path.rstrip('/')
+        with metadata_lock:
+            for name, attrs in resp.get('attrs', {}).items():
+                metadata_cache[sys.intern(f"{parent}/{name}")] = attrs
         return ['.', '..'] + resp.get('dirs', []) + resp.get('files', [])
 
-    def read(self, path, size, offset, fh):
-        logging.debug(f"read called for path: {path}, size: {size}, offset: {offset}")
-        key = (path, offset, size)
-        if key in data_cache:
-            logging.debug(f"Cache hit for {path} at offset {offset}, size {size}")
-            return data_cache[key]
+    @cached(url_cache, lock=url_lock)
+    def _presigned_url(self, path):
         url_json = self._api_request('GET', '/cloudfs/file', params={'path': path})
         presigned_url = url_json.get('url')
         if not presigned_url:
             logging.error(f"Presigned URL not received for {path}")
             raise FuseOSError(EIO)
-        
-        # Read data from the signed URL
-        headers = {'Range': f'bytes={offset}-{offset + size - 1}'}
-        try:
-            s3_resp = requests.get(presigned_url, headers=headers, timeout=30)
+        return presigned_url
+
+    def _download_block(self, path, presigned_url, index):
+        """Fetches block `index` of `path` with a single Range request and caches it."""
+        start = index * BLOCK_SIZE
+        headers = {'Range': f'bytes={start}-{start + BLOCK_SIZE - 1}'}
+        s3_resp = self.blob_session.get(presigned_url, headers=headers, timeout=30)
+        if s3_resp.status_code == 416:  # block starts at or past EOF
+            block = b''
+        else:
             s3_resp.raise_for_status()
-            data = s3_resp.content
-            data_cache[key] = data
-            logging.debug(f"Successfully read {len(data)} bytes for {path} at offset {offset}")
+            block = s3_resp.content
+        with data_lock:
+            data_cache[(path, index)] = block
+        return block
+
+    def _prefetch_block(self, path, presigned_url, index):
+        try:
+            return self._download_block(path, presigned_url, index)
+        finally:
+            with data_lock:
+                self._inflight.pop((path, index), None)
+
+    def _prefetch(self, path, presigned_url, first):
+        """Queues blocks first..first+READAHEAD_BLOCKS-1 that are neither cached nor in flight."""
+        with data_lock:
+            for index in range(first, first + READAHEAD_BLOCKS):
+                key = (path, index)
+                if key in data_cache or key in self._inflight:
+                    continue
+                self._inflight[key] = self._prefetch_pool.submit(self._prefetch_block, path, presigned_url, index)
+
+    def read(self, path, size, offset, fh):
+        logging.debug("read called for path: %s, size: %d, offset: %d", path, size, offset)
+        if size <= 0:
+            return b''
+        first, last = offset // BLOCK_SIZE, (offset + size - 1) // BLOCK_SIZE
+        with data_lock:
+            sequential = self._last_end.get(path) == offset
+            self._last_end[path] = offset + size
+        blocks = []
+        presigned_url = None
+        try:
+            for index in range(first, last + 1):
+                key = (path, index)
+                with data_lock:
+                    block = data_cache.get(key)
+                    note_data_cache_lookup(block is not None)
+                    pending = leader = None
+                    if block is None:
+                        pending = self._inflight.get(key)
+                        if pending is None:
+                            self._inflight[key] = leader = Future()
+                if pending is not None:
+                    try:
+                        block = pending.result()
+                    except Exception as e:
+                        # A failed read-ahead (or another reader's failed fetch) is never cached;
+                        # retry the block synchronously rather than failing this read
+                        logging.warning(f"In-flight fetch of block {index} of {path} failed, retrying: {e}")
+                        if presigned_url is None:
+                            presigned_url = self._presigned_url(path)
+                        block = self._download_block(path, presigned_url, index)
+                elif leader is not None:
+                    try:
+                        if presigned_url is None:
+                            presigned_url = self._presigned_url(path)
+                        block = self._download_block(path, presigned_url, index)
+                    except Exception as e:
+                        leader.set_exception(e)
+                        raise
+                    finally:
+                        with data_lock:
+                            self._inflight.pop(key, None)
+                    leader.set_result(block)
+                blocks.append(block)
+                if len(block) < BLOCK_SIZE:  # short block means EOF
+                    break
+            else:
+                # Read ahead whenever a sequential reader crosses into a new block, whatever its
+                # read size (the kernel usually issues 128 KiB reads); small scattered reads
+                # (file browsers, indexers) never trigger it and would just waste bandwidth
+                if sequential and (last > first or offset % BLOCK_SIZE == 0):
+                    if presigned_url is None:
+                        presigned_url = self._presigned_url(path)
+                    self._prefetch(path, presigned_url, last + 1)
+            start = offset % BLOCK_SIZE
+            data = b''.join(blocks)[start:start + size]
+            logging.debug("Successfully read %d bytes for %s at offset %d", len(data), path, offset)
             return data
+        except FuseOSError:
+            raise
+        except requests.exceptions.HTTPError as e:
+            logging.error(f"Signed URL HTTP error for {path}: {e}")
+            if e.response.status_code == 404:
+                raise FuseOSError(ENOENT)
+            raise FuseOSError(EIO)
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to read from signed URL for {path}: {e}")
             raise FuseOSError(EIO)
@@ -460,7 +751,7 @@ def authenticate():
     try:
         resp = requests.post(f"{BACKEND}/device/register", json={'device_id': device_id}, timeout=10, verify=True)
         resp.raise_for_status()
-        token = resp.json()['token']
+        token = orjson.loads(resp.content)['token']
         logging.info("Device authenticated and token received.")
         return token
     except requests.exceptions.RequestException as e:
@@ -478,17 +769,20 @@ def main():
     env['CLOUDROM_BACKEND'] = BACKEND
     env['MOUNTPOINT'] = MOUNTPOINT
     
-    if not os.path.exists(MOUNTPOINT):
-        try:
-            os.makedirs(MOUNTPOINT)
-            logging.info(f"Created mountpoint directory: {MOUNTPOINT}")
-        except OSError as e:
-            logging.critical(f"Failed to create mountpoint directory {MOUNTPOINT}: {e}")
-            sys.exit(1)
+    try:
+        os.makedirs(MOUNTPOINT, exist_ok=True)
+    except OSError as e:
+        logging.critical(f"Failed to create mountpoint directory {MOUNTPOINT}: {e}")
+        sys.exit(1)
 
     logging.info(f"Launching FUSE client at {MOUNTPOINT}...")
     try:
-        FUSE(CloudFS(BACKEND, token), MOUNTPOINT, foreground=True, nothreads=False)
+        # Multithreaded dispatch; max_read/max_readahead let the kernel send up to 1 MiB per request.
+        # The mount is read-only, so the kernel may keep lookups and attributes for an hour
+        # (misses for 10s, like negative_cache) instead of calling getattr every second
+        FUSE(CloudFS(BACKEND, token), MOUNTPOINT, foreground=True, nothreads=False,
+             max_read=1048576, max_readahead=1048576, ro=True,
+             attr_timeout=3600, entry_timeout=3600, negative_timeout=10)
     except Exception as e:
         logging.critical(f"Failed to mount FUSE filesystem at {MOUNTPOINT}: {e}")
         sys.exit(1)
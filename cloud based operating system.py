@@ -1,12 +1,18 @@
 import os
 import boto3
+from bisect import bisect_left
 import jwt
+from botocore.config import Config
 from botocore.exceptions import ClientError
+import orjson
 from flask import Flask, request, jsonify, abort
+from flask.json.provider import JSONProvider
 from functools import wraps
-from cachetools import cached, TTLCache
 import logging
+import re
 import sys
+import threading
+import time
 import requests
 import subprocess
 import uuid
@@ -14,7 +20,22 @@ from errno import ENOENT, EIO
 from fuse import FUSE, Operations, FuseOSError
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Serialize straight to bytes, skipping the str round-trip of dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # --- Corrected Section ---
 # Define environment variables first
@@ -29,13 +50,18 @@ if not all([IMAGE_BUCKET, DEVICE_TABLE_NAME, JWT_SECRET_ARN]):
     app.logger.error("Missing one or more required environment variables: IMAGE_BUCKET_NAME, DEVICE_TABLE_NAME, CLOUDROM_SECRET_ARN")
     exit(1)
 aws_region = os.environ.get("AWS_REGION", "us-east-1")
-s3_client = boto3.client('s3', region_name=aws_region)
-dynamodb = boto3.resource('dynamodb', region_name=aws_region)
-secrets_manager = boto3.client('secretsmanager', region_name=aws_region)
-secret_cache = TTLCache(maxsize=1, ttl=300)
+# boto3 clients are shared by every gunicorn worker thread; the default pool of 10 connections
+# per client would queue the 32 gthread workers behind each other on S3/DynamoDB calls
+BOTO_CONFIG = Config(max_pool_connections=64, tcp_keepalive=True)
+s3_client = boto3.client('s3', region_name=aws_region, config=BOTO_CONFIG)
+dynamodb = boto3.resource('dynamodb', region_name=aws_region, config=BOTO_CONFIG)
+secrets_manager = boto3.client('secretsmanager', region_name=aws_region, config=BOTO_CONFIG)
+# JWT secret held in a plain module global: token_required reads it on every request
+SECRET_REFRESH_INTERVAL = 60
+_SECRET = {'v': None, 't': 0.0}
+_secret_lock = threading.Lock()
 
-@cached(secret_cache)
-def get_jwt_secret():
+def _fetch_jwt_secret():
     try:
         response = secrets_manager.get_secret_value(SecretId=JWT_SECRET_ARN)
         return response['SecretString']
@@ -43,6 +69,21 @@ def get_jwt_secret():
         app.logger.error(f"JWT secret retrieval failure from Secrets Manager: {e}")
         raise
 
+def get_jwt_secret(refresh=False):
+    """
+    Returns the JWT secret, fetching it on first use. Rotation is rare and out-of-band, so
+    the value is kept until refresh=True (a signature mismatch) and is refetched at most
+    once per SECRET_REFRESH_INTERVAL, so forged tokens cannot hammer Secrets Manager.
+    """
+    secret = _SECRET['v']
+    if secret is not None and not (refresh and time.monotonic() - _SECRET['t'] >= SECRET_REFRESH_INTERVAL):
+        return secret
+    with _secret_lock:
+        if _SECRET['v'] is None or (refresh and time.monotonic() - _SECRET['t'] >= SECRET_REFRESH_INTERVAL):
+            _SECRET['v'] = _fetch_jwt_secret()
+            _SECRET['t'] = time.monotonic()
+        return _SECRET['v']
+
 device_table = dynamodb.Table(DEVICE_TABLE_NAME)
 
 def token_required(f):
@@ -52,13 +93,16 @@ def token_required(f):
         if not auth_header.startswith('Bearer '):
             app.logger.warning("Authorization header missing or malformed.")
             abort(401, "Authorization header required with Bearer token.")
-        token = auth_header.split(' ')[-1]
+        token = auth_header[7:].strip()
         if not token:
             app.logger.warning("Authorization token is empty.")
             abort(401, "Authorization token missing.")
         try:
-            secret = get_jwt_secret()
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
+            try:
+                payload = jwt.decode(token, get_jwt_secret(), algorithms=['HS256'])
+            except jwt.InvalidSignatureError:
+                # The secret may have been rotated since it was read; retry once with a fresh copy
+                payload = jwt.decode(token, get_jwt_secret(refresh=True), algorithms=['HS256'])
             request.device_id = payload['device_id']
         except jwt.ExpiredSignatureError:
             app.logger.warning(f"Token expired for device: {request.device_id if hasattr(request, 'device_id') else 'unknown'}")
@@ -72,9 +116,15 @@ def token_required(f):
         return f(*args, **kwargs)
     return decorated
 
+# Paths made only of plain segments (no '.'/'..' segments, empty segments or trailing '/')
+# are already normal; normalize_path returns them without going through os.path.normpath
+_SAFE_PATH_RE = re.compile(r'/?[A-Za-z0-9_-][A-Za-z0-9._-]*(?:/[A-Za-z0-9_-][A-Za-z0-9._-]*)*')
+
 def normalize_path(path):
     if not path:
         return ''
+    if _SAFE_PATH_RE.fullmatch(path):
+        return path.lstrip('/')
     normalized = os.path.normpath(path).lstrip(os.sep)
     if normalized.startswith('..') or normalized.startswith('./..'):
         app.logger.warning(f"Attempted path traversal detected: {path}")
@@ -130,18 +180,105 @@ def latest_image():
         app.logger.critical(f"Unexpected error retrieving latest image: {e}")
         abort(500, "Internal server error.")
 
+def object_attrs(obj):
+    """Builds the stat dict for a file from a list_objects_v2 Contents entry."""
+    mtime = obj['LastModified'].timestamp()
+    return {
+        'st_mode': 0o100644,
+        'st_nlink': 1,
+        'st_size': obj['Size'],
+        'st_ctime': mtime,
+        'st_mtime': mtime,
+        'st_atime': mtime,
+    }
+
+DIR_ATTRS = dict(st_mode=0o040755, st_nlink=2, st_size=4096)
+
+# In-memory index of every key in the bucket, rebuilt every KEY_INDEX_REFRESH seconds by a
+# background thread so list_dir can answer from memory instead of calling S3 (0 disables it).
+# _key_index is (sorted keys, parallel slim Contents entries), replaced whole on each rebuild.
+KEY_INDEX_REFRESH = int(os.environ.get("KEY_INDEX_REFRESH", "300"))
+_key_index = None
+
+def build_key_index():
+    entries = []
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=IMAGE_BUCKET):
+        entries.extend((o['Key'], {'Size': o['Size'], 'LastModified': o['LastModified']})
+                       for o in page.get('Contents', ()))
+    entries.sort(key=lambda e: e[0])
+    return [k for k, _ in entries], [o for _, o in entries]
+
+def refresh_key_index():
+    global _key_index
+    while True:
+        try:
+            started = time.monotonic()
+            _key_index = build_key_index()
+            app.logger.info(f"Key index rebuilt: {len(_key_index[0])} keys in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            app.logger.error(f"Key index rebuild failed, keeping the previous one: {e}")
+        time.sleep(KEY_INDEX_REFRESH)
+
+if KEY_INDEX_REFRESH > 0:
+    threading.Thread(target=refresh_key_index, name='key-index', daemon=True).start()
+
+def list_indexed(index, path):
+    """Splits the keys under prefix path into (dirs, files, objects) using the key index."""
+    keys, objects = index
+    start = len(path)
+    dirs, files, found = [], [], []
+    i = bisect_left(keys, path)
+    while i < len(keys) and keys[i].startswith(path):
+        name = keys[i][start:]
+        slash = name.find('/')
+        if slash < 0:
+            if name:
+                files.append(name)
+                found.append(objects[i])
+            i += 1
+        else:
+            dirs.append(name[:slash])
+            # Jump past every key in this subdirectory; '0' is the character after '/'
+            i = bisect_left(keys, f"{path}{name[:slash]}0", i)
+    return dirs, files, found
+
+def list_live(path):
+    """Splits the keys under prefix path into (dirs, files, objects) with a delimited S3 listing."""
+    # Page through the whole listing (one call stops at 1000 keys); names are sliced off
+    # the known prefix instead of split, and anything nested deeper than one level is skipped
+    start = len(path)
+    dirs, files, objects = [], [], []
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=IMAGE_BUCKET, Prefix=path, Delimiter='/'):
+        dirs.extend(p['Prefix'][start:-1] for p in page.get('CommonPrefixes', ()))
+        for o in page.get('Contents', ()):
+            name = o['Key'][start:]
+            if name and '/' not in name:
+                files.append(name)
+                objects.append(o)
+    return dirs, files, objects
+
 @app.route('/cloudfs/list', methods=['GET'])
 @token_required
 def list_dir():
+    """
+    Lists files and directories under a path, from the key index once it is built.
+    With ?attrs=1 the response also carries a stat dict per entry, built from the
+    Size/LastModified the listing already returns, so clients can skip per-entry lookups.
+    """
     path = normalize_path(request.args.get('path', '/'))
     if path and not path.endswith('/') and path != '':
         path += '/'
+    want_attrs = request.args.get('attrs') == '1'
     app.logger.info(f"Listing directory {path} for device {request.device_id}.")
     try:
-        resp = s3_client.list_objects_v2(Bucket=IMAGE_BUCKET, Prefix=path, Delimiter='/')
-        dirs = [p['Prefix'].rstrip('/').split('/')[-1] for p in resp.get('CommonPrefixes', [])]
-        files = [o['Key'].split('/')[-1] for o in resp.get('Contents', []) if o['Key'] != path]
-        return jsonify({'dirs': dirs, 'files': files})
+        index = _key_index
+        dirs, files, objects = list_indexed(index, path) if index is not None else list_live(path)
+        body = {'dirs': dirs, 'files': files}
+        if want_attrs:
+            attrs = {name: object_attrs(o) for name, o in zip(files, objects)}
+            attrs.update((d, DIR_ATTRS) for d in dirs)
+            body['attrs'] = attrs
+        return jsonify(body)
     except ClientError as e:
         app.logger.error(f"S3 list directory failed for path {path}: {e}")
         abort(500, "Failed to list directory.")
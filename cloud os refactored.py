@@ -104,24 +104,42 @@ class LocalStorage(StorageBackend):
     def __init__(self, root: Path):
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self._root_str = os.path.normpath(os.path.abspath(self.root))
+        self._root_prefix = os.path.join(self._root_str, "")
 
     def _abspath(self, rel: str) -> Path:
         rel = rel.lstrip("/\\")
-        return (self.root / rel).resolve()
+        # Lexical normalisation only; resolve() would lstat every component of the path
+        p = os.path.normpath(os.path.join(self._root_str, rel))
+        if p != self._root_str and not p.startswith(self._root_prefix):
+            raise FileNotFoundError(rel)
+        return Path(p)
 
     def list_files(self, path: str) -> List[str]:
-        base = self._abspath(path)
-        if not base.exists():
+        try:
+            base = str(self._abspath(path))
+        except FileNotFoundError:
             return []
-        if base.is_file():
+        if os.path.isfile(base):
             return [str(Path(path).as_posix())]
+        if not os.path.isdir(base):
+            return []
+        # Iterative scandir walk on plain strings: directory entries carry their type, so
+        # only symlinks need a stat, and no Path object is built per entry
+        start = len(self._root_prefix)
         items: List[str] = []
-        for p in base.rglob("*"):
-            if p.is_file():
-                try:
-                    items.append(str(p.relative_to(self.root).as_posix()))
-                except Exception:
-                    pass
+        stack = [base]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        items.append(entry.path[start:].replace(os.sep, "/"))
         return sorted(items)
 
     def read_text(self, path: str) -> str:
@@ -6,7 +6,7 @@ This monolithic script fuses the **Flask backend**, **JWT auth**, **Google-Cloud
 integration**, **FUSE read-only client**, and **self-registration logic** that
 were previously split across several modules.  Run with:
 
-    # Start the backend
+    # Start the backend (re-execs under gunicorn; FLASK_DEV=1 keeps Flask's dev server)
     $ CLOUD_MODE=server python3 hybrid_cloud_os.py
 
     # Or, run the client side (FUSE + self-registration)
@@ -18,11 +18,13 @@ were previously split across several modules.  Run with:
 Environment variables required (client or server-side) are validated at
 runtime and sensible error messages are emitted.
 """
-import os, sys, json, uuid, jwt, time, subprocess, logging, requests
+import os, re, sys, hmac, base64, orjson, uuid, jwt, time, threading, subprocess, logging, requests
 from datetime import datetime, timedelta
 from functools import wraps
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
 from errno import ENOENT, EIO
-from cachetools import cached, TTLCache
+from cachetools import TTLCache
 
 # ---------------------------------------------------------------------------
 # │ 1. CONFIGURATION & LOGGING                                              │
@@ -45,8 +47,12 @@ SERVICE_ACCOUNT_JSON = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS_JSON")
 # ---------------------------------------------------------------------------
 # │ 2. COMMON UTILITIES                                                     │
 # ---------------------------------------------------------------------------
+# Paths of plain segments only (no ./.. or empty segments, no trailing '/') are already normal
+_SAFE_PATH_RE = re.compile(r'/?[A-Za-z0-9_-][A-Za-z0-9._-]*(?:/[A-Za-z0-9_-][A-Za-z0-9._-]*)*')
+
 def normalize_path(path: str) -> str:
     if not path: return ""
+    if _SAFE_PATH_RE.fullmatch(path): return path.lstrip("/")    # fast path, skips normpath
     p = os.path.normpath(path).lstrip(os.sep)
     if p.startswith(".."): abort(400, "Invalid path")
     return p
@@ -59,6 +65,28 @@ def get_device_id() -> str:
     try: return str(uuid.getnode())
     except Exception: return os.uname()[1]
 
+class StripedTTLCache:
+    """
+    TTLCache split into n independently locked shards (n a power of two), picked by hash(key),
+    so request threads touching different keys rarely contend on one lock.
+    """
+    def __init__(self, maxsize, ttl, n=16):
+        self.mask   = n - 1
+        self.shards = [(threading.Lock(), TTLCache(maxsize=max(1, maxsize//n), ttl=ttl)) for _ in range(n)]
+    def _shard(self, key): return self.shards[hash(key) & self.mask]
+    def get(self, key, default=None):
+        lock, c = self._shard(key)
+        with lock: return c.get(key, default)
+    def pop(self, key, default=None):
+        lock, c = self._shard(key)
+        with lock: return c.pop(key, default)
+    def __contains__(self, key):
+        lock, c = self._shard(key)
+        with lock: return key in c
+    def __setitem__(self, key, value):
+        lock, c = self._shard(key)
+        with lock: c[key] = value
+
 # ---------------------------------------------------------------------------
 # │ 3. SERVER  (Flask + GCP + JWT)                                          │
 # ---------------------------------------------------------------------------
@@ -73,12 +101,13 @@ if MODE == "server":
     #
     # -- Initialise Google-Cloud clients -----------------------------------
     #
-    from flask import Flask, request, jsonify, abort
+    from flask import Flask, request, jsonify, abort, redirect
+    from flask.json.provider import JSONProvider
     from google.cloud import storage, firestore, secretmanager
-    from google.api_core.exceptions import NotFound, GoogleAPIError
+    from google.api_core.exceptions import NotFound, GoogleAPIError, AlreadyExists
     from google.oauth2 import service_account
 
-    creds_info = json.loads(SERVICE_ACCOUNT_JSON)
+    creds_info = orjson.loads(SERVICE_ACCOUNT_JSON)
     creds      = service_account.Credentials.from_service_account_info(creds_info)
     storage_client  = storage.Client(credentials=creds)
     firestore_client= firestore.Client(credentials=creds)
@@ -86,40 +115,110 @@ if MODE == "server":
     bucket          = storage_client.bucket(IMAGE_BUCKET)
     logging.info("GCP clients initialised")
 
-    secret_cache = TTLCache(maxsize=1, ttl=300)
-    @cached(secret_cache)
-    def jwt_secret():
+    # JWT signing key as raw bytes in a module global: fetched before serving, then refreshed
+    # by a daemon thread, so token_required reads one name instead of going through a cache
+    SECRET_REFRESH = 250
+    def fetch_jwt_secret() -> bytes:
         path = f"projects/{GCP_PROJECT}/secrets/{SECRET_NAME}/versions/latest"
-        return secret_client.access_secret_version(name=path).payload.data.decode()
+        return secret_client.access_secret_version(name=path).payload.data
+    JWT_SECRET = fetch_jwt_secret()
+
+    def refresh_jwt_secret():
+        global JWT_SECRET
+        while True:
+            time.sleep(SECRET_REFRESH)
+            # Any failure (API, auth refresh, transport) must not end the thread, or the key is never refreshed again
+            try: JWT_SECRET = fetch_jwt_secret()
+            except Exception as e: logging.error("JWT secret refresh failed, keeping current key: %r", e)
+    threading.Thread(target=refresh_jwt_secret, name="jwt-secret-refresh", daemon=True).start()
+
+    # Verified JWT payloads by raw token: a device reuses one token for every call, so
+    # repeat requests skip the HMAC check + JSON parse. Failures are never cached.
+    jwt_payload_cache = StripedTTLCache(maxsize=4096, ttl=60)
 
     # --------------------------- Flask setup ------------------------------
+    class OrjsonProvider(JSONProvider):
+        """jsonify / request.get_json via orjson; responses are written as bytes directly."""
+        def dumps(self, obj, **kw): return orjson.dumps(obj).decode()
+        def loads(self, s, **kw):   return orjson.loads(s)
+        def response(self, *args, **kw):
+            return self._app.response_class(orjson.dumps(self._prepare_response_obj(args, kw)),
+                                             mimetype="application/json")
+
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
-    def token_required(f):
+    def _b64url(seg: bytes) -> bytes:
+        return base64.urlsafe_b64decode(seg + b"=" * (-len(seg) % 4))
+
+    def verify_hs256(token: str, key: bytes) -> dict:
+        """
+        jwt.decode(token, key, algorithms=["HS256"]) for the tokens register issues, minus PyJWT's
+        generic option handling: OpenSSL HMAC via hmac.new + orjson. Raises PyJWT's exceptions.
+        """
+        try:
+            signing_input, _, sig = token.encode().rpartition(b".")
+            header, _, body = signing_input.partition(b".")
+            alg    = orjson.loads(_b64url(header)).get("alg")
+            claims = orjson.loads(_b64url(body));  sig = _b64url(sig)
+        except (ValueError, AttributeError) as e:           # bad base64/JSON, header not an object
+            raise jwt.DecodeError(f"Malformed token: {e}")
+        if alg != "HS256" or not isinstance(claims, dict): raise jwt.InvalidTokenError("Unsupported token")
+        if not hmac.compare_digest(hmac.new(key, signing_input, "sha256").digest(), sig):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+        if "exp" in claims and int(claims["exp"]) <= time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return claims
+
+    def token_required(f: Callable) -> Callable:
         @wraps(f)
         def deco(*a, **kw):
             ah = request.headers.get("Authorization","")
             if not ah.startswith("Bearer "): abort(401,"Missing Bearer token")
-            try:
-                payload = jwt.decode(ah.split()[1], jwt_secret(), algorithms=["HS256"])
-                request.device_id = payload["device_id"]
-            except jwt.ExpiredSignatureError: abort(401,"Token expired")
-            except jwt.PyJWTError:            abort(401,"Invalid token")
+            token = ah.split()[1]
+            payload = jwt_payload_cache.get(token)
+            if payload is not None and payload.get("exp", float("inf")) < time.time():
+                jwt_payload_cache.pop(token, None)
+                abort(401,"Token expired")
+            if payload is None:
+                try:
+                    payload = verify_hs256(token, JWT_SECRET)
+                except jwt.ExpiredSignatureError: abort(401,"Token expired")
+                except jwt.PyJWTError:            abort(401,"Invalid token")
+                jwt_payload_cache[token] = payload
+            request.device_id = payload["device_id"]
             return f(*a, **kw)
         return deco
 
     # --------------------------- API routes -------------------------------
+    IMAGE_URL_TTL = timedelta(hours=1)      # signed-URL lifetimes, built once instead of per request
+    FILE_URL_TTL  = timedelta(minutes=15)
+
+    # Devices known to have a Firestore doc -> (token, exp, signing key) last issued to them;
+    # restarts re-register the same IDs all the time, so repeats skip Firestore and re-signing
+    registered_devices = StripedTTLCache(maxsize=100_000, ttl=3600)
+    TOKEN_LIFETIME     = 365 * 86400
+
     @app.route("/device/register", methods=["POST"])
     def register():
         data = request.get_json(silent=True) or {}
         dev  = data.get("device_id");  assert dev, abort(400,"device_id required")
-        doc  = firestore_client.collection(FIRESTORE_COLLECTION).document(dev)
-        if not doc.get().exists:
-            doc.set({"status":"registered","created":datetime.utcnow()})
-            logging.info("New device registered: %s", dev)
-        token = jwt.encode({"device_id":dev,
-                            "exp": datetime.utcnow()+timedelta(days=365)},
-                           jwt_secret(), algorithm="HS256")
+        now = time.time()
+        hit = registered_devices.get(dev)
+        if hit is not None and hit[2] == JWT_SECRET and hit[1] - now > 86400:
+            return jsonify(token=hit[0])
+        if hit is None:
+            # create() is a single write that fails if the doc exists, so no get() round trip
+            # first, and a re-registration never overwrites the original "created" time
+            doc = firestore_client.collection(FIRESTORE_COLLECTION).document(dev)
+            try:
+                doc.create({"status":"registered","created":datetime.utcnow()})
+                logging.info("New device registered: %s", dev)
+            except AlreadyExists: pass
+        key = JWT_SECRET
+        exp = int(now) + TOKEN_LIFETIME
+        token = jwt.encode({"device_id":dev, "exp":exp}, key, algorithm="HS256")
+        registered_devices[dev] = (token, exp, key)
         return jsonify(token=token)
 
     @app.route("/image/latest")
@@ -127,59 +226,81 @@ if MODE == "server":
     def latest_image():
         try:
             url = bucket.blob("rootfs.img").generate_signed_url(
-                version="v4", expiration=timedelta(hours=1), method="GET")
+                version="v4", expiration=IMAGE_URL_TTL, method="GET")
             return jsonify(url=url)
         except GoogleAPIError as e:
             logging.error("Signed-URL generation failed: %s", e); abort(500)
 
     # ---------- CloudFS proxy endpoints (list / attrs / file) -------------
-    def gcs_list(prefix):
-        iterator = bucket.list_blobs(prefix=prefix, delimiter="/")
+    DIR_ATTRS = dict(st_mode=0o040755, st_nlink=2, st_size=4096)
+
+    def blob_attrs(b) -> dict:
+        # Stat dict from metadata a listed/reloaded Blob already carries
+        return dict(st_mode=0o100644, st_nlink=1, st_size=b.size,
+                    st_ctime=b.time_created.timestamp(),
+                    st_mtime=b.updated.timestamp(), st_atime=b.updated.timestamp())
+
+    # Partial response: only the blob fields blob_attrs/gcs_list read, plus paging + prefixes
+    LIST_FIELDS    = "items(name,size,updated,timeCreated),prefixes,nextPageToken"
+    LIST_PAGE_SIZE = 1000
+
+    def gcs_list(prefix: str, attrs: Optional[dict] = None) -> Tuple[List[str], List[str]]:
+        iterator = bucket.list_blobs(prefix=prefix, delimiter="/", fields=LIST_FIELDS, page_size=LIST_PAGE_SIZE)
         dirs, files = [], []
+        # Iterating the blobs pages through the listing; only then is iterator.prefixes filled
+        for b in iterator:
+            if b.name!=prefix and (name:=b.name.split("/")[-1]):
+                files.append(name)
+                if attrs is not None: attrs[name] = blob_attrs(b)
         for p in iterator.prefixes:
             name = p.rstrip("/").split("/")[-1];  dirs.append(name)
-        for b in iterator:
-            if b.name!=prefix and (name:=b.name.split("/")[-1]): files.append(name)
+            if attrs is not None: attrs[name] = DIR_ATTRS
         return dirs, files
 
     @app.route("/cloudfs/list")
     @token_required
     def cloudfs_list():
+        # ?attrs=1 adds {name: stat} for every entry so clients skip N follow-up /cloudfs/attrs calls
         path   = normalize_path(request.args.get("path","/"))
-        prefix = "" if path=="/" else f"{path.rstrip('/')}/"
-        dirs, files = gcs_list(prefix)
-        return jsonify(dirs=dirs, files=files)
+        prefix = "" if path in ("","/") else f"{path.rstrip('/')}/"
+        attrs  = {} if request.args.get("attrs")=="1" else None
+        dirs, files = gcs_list(prefix, attrs)
+        if attrs is None: return jsonify(dirs=dirs, files=files)
+        return jsonify(dirs=dirs, files=files, attrs=attrs)
+
+    # Signed URLs per path: issued for 15 min and reused for 10, so every URL handed out has
+    # at least 5 min left (clients cache them for ~4). Saves the RSA signature + exists() GET.
+    signed_url_cache = StripedTTLCache(maxsize=8192, ttl=600)
 
     @app.route("/cloudfs/file")
     @token_required
     def cloudfs_file():
         path = normalize_path(request.args.get("path") or abort(400))
-        blob = bucket.blob(path);  blob.reload()
-        if not blob.exists(): abort(404)
-        url = blob.generate_signed_url(version="v4",
-                                       expiration=timedelta(minutes=5),
-                                       method="GET")
-        return jsonify(url=url)
+        if (url := signed_url_cache.get(path)) is None:
+            blob = bucket.blob(path)
+            if not blob.exists(): abort(404)     # signing needs no metadata; exists() is one small GET
+            url = blob.generate_signed_url(version="v4",
+                                           expiration=FILE_URL_TTL,
+                                           method="GET")
+            signed_url_cache[path] = url
+        # 302 to the object: curl -L / requests can follow it, and the FUSE client reads the
+        # Location header directly - no JSON body to build or parse
+        return redirect(url, code=302)
 
     @app.route("/cloudfs/attrs")
     @token_required
     def cloudfs_attrs():
         p = normalize_path(request.args.get("path") or abort(400))
         if p in ("","/"):  # root dir
-            return jsonify(st_mode=0o040755, st_nlink=2, st_size=4096)
+            return jsonify(DIR_ATTRS)
         if p.endswith("/"):  # explicit dir
-            if gcs_list(p.rstrip("/")+"/")[0] or gcs_list(p.rstrip("/")+ "/")[1]:
-                return jsonify(st_mode=0o040755, st_nlink=2, st_size=4096)
+            d, f = gcs_list(p.rstrip("/")+"/")
+            if d or f: return jsonify(DIR_ATTRS)
             abort(404)
         blob = bucket.blob(p)
-        if not blob.exists(): abort(404)
-        blob.reload()
-        return jsonify(
-            st_mode=0o100644, st_nlink=1, st_size=blob.size,
-            st_ctime=blob.time_created.timestamp(),
-            st_mtime=blob.updated.timestamp(),
-            st_atime=blob.updated.timestamp(),
-        )
+        try: blob.reload()                   # one GET: fetches metadata, or NotFound
+        except NotFound: abort(404)
+        return jsonify(blob_attrs(blob))
 
     @app.route("/report/health", methods=["POST"])
     @token_required
@@ -190,7 +311,20 @@ if MODE == "server":
     def root(): return "Backend Alive"
 
     if __name__ == "__main__":
-        app.run(host="0.0.0.0", port=8080, debug=False)
+        if os.getenv("FLASK_DEV"):
+            app.run(host="0.0.0.0", port=8080, debug=False, threaded=True)
+        else:
+            # Production: re-exec under gunicorn with gthread workers, the same setup as the
+            # backend image. Every route waits on GCS/Firestore, so 32 threads per worker keep
+            # that I/O overlapped (gevent would need grpc's gevent shim for Firestore).
+            here, name = os.path.split(os.path.abspath(__file__))
+            argv = ["gunicorn", "--chdir", here, "--bind", "0.0.0.0:8080",
+                    "--workers", str(os.cpu_count() or 1), "--worker-class", "gthread", "--threads", "32",
+                    "--worker-tmp-dir", "/dev/shm", f"{os.path.splitext(name)[0]}:app"]
+            try: os.execvp(argv[0], argv)
+            except FileNotFoundError:
+                logging.warning("gunicorn not installed; falling back to Flask's threaded server")
+                app.run(host="0.0.0.0", port=8080, debug=False, threaded=True)
 
 # ---------------------------------------------------------------------------
 # │ 4. CLIENT  (FUSE mount + self-register)                                 │
@@ -201,10 +335,12 @@ else:
     #
     if not BACKEND:
         logging.critical("CLOUDROM_BACKEND env var not set"); sys.exit(1)
-    try: import requests, stat, errno
+    try: import requests, stat, errno, hashlib
     except ImportError as e:
         logging.critical("python-fuse and requests required: %s", e); sys.exit(1)
     from fuse import FUSE, Operations, FuseOSError
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 
     # ---------------- Device auth & token ---------------------------------
     def authenticate() -> str:
@@ -212,49 +348,173 @@ else:
         logging.info("Registering device_id %s at %s", dev, BACKEND)
         try:
             r = requests.post(f"{BACKEND}/device/register", json={"device_id":dev}, timeout=10, verify=True)
-            r.raise_for_status();  return r.json()["token"]
+            r.raise_for_status();  return orjson.loads(r.content)["token"]
         except requests.RequestException as e:
             logging.critical("Device auth failed: %s", e); sys.exit(1)
 
     TOKEN = authenticate()
     HEAD  = {"Authorization": f"Bearer {TOKEN}"}
+
+    # Keep-alive pools instead of a fresh connection + TLS handshake per FUSE call. Signed
+    # storage URLs get their own session: separate pool, and the Bearer token never leaks there.
+    def pooled_session(headers=None):
+        s = requests.Session();  s.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64,
+                              max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[502,503,504]))
+        s.mount("https://", adapter);  s.mount("http://", adapter)
+        return s
+    SESSION      = pooled_session(HEAD)
+    BLOB_SESSION = pooled_session()
+    BLOCK      = 1 << 20                # file data is cached in aligned 1 MiB blocks
     meta_cache = TTLCache(maxsize=1024, ttl=30)
-    data_cache = TTLCache(maxsize=2048, ttl=300)
+    data_cache = TTLCache(maxsize=256*BLOCK, ttl=300, getsizeof=len)   # (path, version, block) -> bytes; size in bytes
+    url_cache  = TTLCache(maxsize=1024, ttl=250)                       # server's URLs have >=5 min left
+    cache_lock = threading.Lock()       # guards both caches + inflight across FUSE threads
+    inflight   = {}                     # cache key -> Future of the one fetch in progress
+
+    # Second, on-disk block tier that survives remounts: one file per block under
+    # DISK_CACHE/<blake2b(path, version)>/<index>, where version is the object's size + mtime, so an
+    # overwritten object gets a fresh directory instead of serving old blocks. Blocks written more
+    # than DISK_CACHE_AGE ago are swept hourly, then the least recently read blocks until the cache
+    # fits in DISK_CACHE_MAX (CLOUDFS_DISK_CACHE_MAX_MB, default 10 GiB). CLOUDFS_DISK_CACHE="" turns it off.
+    DISK_CACHE     = os.environ.get("CLOUDFS_DISK_CACHE", os.path.expanduser("~/.cloudos/cache/blocks"))
+    DISK_CACHE_AGE = 24 * 3600
+    DISK_CACHE_MAX = int(os.environ.get("CLOUDFS_DISK_CACHE_MAX_MB", 10240)) << 20
+
+    def disk_block_path(path, version, i):
+        digest = hashlib.blake2b(f"{path}\0{version}".encode(), digest_size=16).hexdigest()
+        return os.path.join(DISK_CACHE, digest, str(i))
+
+    def disk_get(path, version, i):
+        try:
+            with open(disk_block_path(path, version, i), "rb") as fp:
+                # stamp atime ourselves (relatime/noatime mounts don't) for the LRU sweep; mtime stays the write time
+                os.utime(fp.fileno(), ns=(time.time_ns(), os.fstat(fp.fileno()).st_mtime_ns))
+                return fp.read()
+        except OSError: return None
+
+    def disk_put(path, version, i, data):
+        f = disk_block_path(path, version, i);  tmp = f"{f}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(f), exist_ok=True)
+            with open(tmp, "wb") as fp: fp.write(data)
+            os.replace(tmp, f)                 # atomic: readers never see a partial block
+        except OSError as e: logging.debug("Disk cache write failed for %s: %s", f, e)
+
+    def sweep_disk_cache():
+        while True:
+            cutoff = time.time() - DISK_CACHE_AGE
+            kept = []                                  # (atime, size, path) of blocks that survive the age rule
+            for root, dirs, files in os.walk(DISK_CACHE):
+                for name in files:
+                    f = os.path.join(root, name)
+                    try:
+                        st = os.stat(f)
+                        if st.st_mtime < cutoff: os.unlink(f)
+                        else: kept.append((st.st_atime, st.st_size, f))
+                    except OSError: pass
+            total = sum(size for _, size, _ in kept)
+            for _, size, f in sorted(kept):            # least recently read first
+                if total <= DISK_CACHE_MAX: break
+                try: os.unlink(f);  total -= size
+                except OSError: pass
+            for root, dirs, files in os.walk(DISK_CACHE, topdown=False):
+                if root != DISK_CACHE:
+                    try: os.rmdir(root)                # only succeeds once the dir is empty
+                    except OSError: pass
+            time.sleep(3600)
+
+    if DISK_CACHE:
+        threading.Thread(target=sweep_disk_cache, name="disk-cache-sweep", daemon=True).start()
+
+    def coalesced(cache, key):
+        """Memoize in cache under key(*args); concurrent misses on one key share a single fetch."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(self, *args):
+                k = key(*args)
+                with cache_lock:
+                    value = cache.get(k)
+                    pending = inflight.get(k) if value is None else None
+                    if value is None and pending is None: inflight[k] = leader = Future()
+                if value is not None: return value
+                if pending is not None: return pending.result()   # re-raises the leader's error
+                try:
+                    value = fn(self, *args)
+                    with cache_lock: cache[k] = value
+                except Exception as e:
+                    leader.set_exception(e); raise
+                finally:
+                    with cache_lock: inflight.pop(k, None)
+                leader.set_result(value);  return value
+            return wrapper
+        return decorator
 
     # ---------------- FUSE filesystem -------------------------------------
     class CloudFS(Operations):
-        def _req(self, method, path, **kw):
-            url=f"{BACKEND}{path}";  kw.setdefault("headers",HEAD)
+        def _req(self, method, path, parse=True, **kw):
+            url=f"{BACKEND}{path}"
             try:
-                r=requests.request(method,url,timeout=10,verify=True,**kw)
-                r.raise_for_status(); return r.json()
+                r=SESSION.request(method,url,timeout=10,**kw)
+                r.raise_for_status(); return orjson.loads(r.content) if parse else r
             except requests.RequestException as e:
                 if isinstance(e, requests.HTTPError) and e.response.status_code==404: raise FuseOSError(ENOENT)
                 logging.error("HTTP error: %s", e); raise FuseOSError(EIO)
 
-        @cached(meta_cache)
+        @coalesced(meta_cache, key=lambda path, fh=None: ("getattr", path))
         def getattr(self, path, fh=None):
             if path=="/": return dict(st_mode=0o040755, st_nlink=2, st_size=4096)
             return self._req("GET","/cloudfs/attrs", params={"path":path})
 
-        @cached(meta_cache)
+        @coalesced(meta_cache, key=lambda path, fh: ("readdir", path))
         def readdir(self, path, fh):
-            j = self._req("GET","/cloudfs/list", params={"path":path})
+            j = self._req("GET","/cloudfs/list", params={"path":path, "attrs":1})
+            # Prime getattr's entries (same ("getattr", path) key) so ls -l needs no per-entry calls
+            parent = path.rstrip("/")
+            with cache_lock:
+                for name, a in j.get("attrs", {}).items(): meta_cache[("getattr", f"{parent}/{name}")] = a
             return [".",".."]+j["dirs"]+j["files"]
 
+        @coalesced(url_cache, key=lambda path: path)
+        def _url(self, path):
+            # Take the signed URL from the 302 without following it, so it can be cached and the
+            # Bearer token is never sent toward the storage host
+            r = self._req("GET","/cloudfs/file", parse=False, params={"path":path}, allow_redirects=False)
+            return r.headers["Location"]
+
+        @coalesced(data_cache, key=lambda path, version, i: (path, version, i))
+        def _block(self, path, version, i):
+            if DISK_CACHE and (data := disk_get(path, version, i)) is not None: return data
+            # identity encoding: the body is the raw byte range, so it can be read undecoded
+            h={"Range":f"bytes={i*BLOCK}-{(i+1)*BLOCK-1}", "Accept-Encoding":"identity"}
+            with BLOB_SESSION.get(self._url(path),headers=h,timeout=30,stream=True) as r:
+                if r.status_code==416: data = b""      # block starts at/after EOF
+                else: r.raise_for_status(); data = r.raw.read(BLOCK)   # immutable bytes, sized to the body
+            if DISK_CACHE: disk_put(path, version, i, data)
+            return data
+
         def read(self, path, size, offset, fh):
-            key=(path,offset,size)
-            if key in data_cache: return data_cache[key]
-            url=self._req("GET","/cloudfs/file", params={"path":path})["url"]
-            h={"Range":f"bytes={offset}-{offset+size-1}"}
-            r=requests.get(url,headers=h,timeout=30); r.raise_for_status()
-            data_cache[key]=r.content; return r.content
+            # Serve any (offset, size) from whole aligned blocks so overlapping reads share fetches.
+            # Blocks are keyed by the object's size + mtime, so one read never mixes two versions.
+            a = self.getattr(path)
+            version = f"{a.get('st_size')}:{a.get('st_mtime')}"
+            blocks=[]
+            for i in range(offset//BLOCK, (offset+size-1)//BLOCK + 1):
+                blocks.append(b := self._block(path, version, i))
+                if len(b) < BLOCK: break                   # short block: end of file
+            start=offset%BLOCK
+            return b"".join(blocks)[start:start+size]
 
         # R/O filesystem -- reject modifications
         def _ro(*a, **k): raise FuseOSError(errno.EROFS)
         create=write=unlink=rmdir=mkdir=rename=truncate=_ro
 
     # ---------------- Launch FUSE -----------------------------------------
-    if not os.path.exists(MOUNTPOINT): os.makedirs(MOUNTPOINT, exist_ok=True)
+    os.makedirs(MOUNTPOINT, exist_ok=True)
     logging.info("Mounting CloudFS at %s", MOUNTPOINT)
-    FUSE(CloudFS(), MOUNTPOINT, foreground=True, ro=True)
+    # Read-only mount: let the kernel keep lookups/attrs for an hour, misses for 10s, and file
+    # pages across opens (kernel_cache). Ops run on many threads (all caches are locked) and
+    # the kernel may ask for a whole 1 MiB block per read.
+    FUSE(CloudFS(), MOUNTPOINT, foreground=True, ro=True, nothreads=False,
+         max_read=1048576, max_readahead=1048576, kernel_cache=True,
+         attr_timeout=3600, entry_timeout=3600, negative_timeout=10)
@@ -55,7 +55,7 @@ services:
       - "8080:8080"
     # In production, add a reverse proxy (nginx/ALB) for HTTPS
     command: >
-      gunicorn --bind 0.0.0.0:8080 --workers 4 main:app
+      gunicorn --bind 0.0.0.0:8080 --workers 2 --worker-class gthread --threads 32 --worker-tmp-dir /dev/shm main:app
 
   # ----------- FUSE Client -----------
   cloudfs_fuse:
@@ -8,15 +8,155 @@ import platform
 import shutil
 import json
 import time
+import signal
+import threading
+import functools
+import hashlib
+import itertools
+from string import Template
+from functools import cached_property
 from pathlib import Path
+try:
+    import orjson
+except ImportError:
+    orjson = None
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger()
+def read_json(path):
+    data = Path(path).read_bytes()
+    return orjson.loads(data) if orjson else json.loads(data)
+def write_if_changed(path, content):
+    path = Path(path)
+    if isinstance(content, str):
+        content = content.replace('\n', os.linesep).encode('utf-8')
+    try:
+        if path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(content)
+    return True
+def write_json(path, obj):
+    if orjson:
+        return write_if_changed(path, orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    return write_if_changed(path, json.dumps(obj, indent=2))
+@functools.lru_cache(maxsize=None)
+def _load_config(path_str, mtime):
+    return read_json(path_str)
+def load_config(path):
+    return _load_config(str(path), path.stat().st_mtime_ns)
+_WINDOWS_SCRIPT = Template("""@echo off
+cd /d "$setup_dir"
+call cloudos.bat
+set MODE=$mode
+"$python" "$script"
+pause
+""")
+_LINUX_SERVICE = Template("""[Unit]
+Description=Cloud OS $mode Service
+After=network.target
+[Service]
+Type=simple
+User=$user
+Group=$user
+Environment=MODE=$mode
+Environment=GOOGLE_APPLICATION_CREDENTIALS=$credentials
+EnvironmentFile=$env_file
+ExecStart=$python $script
+Restart=always
+RestartSec=10
+[Install]
+WantedBy=multi-user.target
+""")
+_MACOS_PLIST = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>Label</key>
+    <string>com.cloudos.$mode</string>
+    <key>ProgramArguments</key>
+    <array>
+        <string>$python</string>
+        <string>$script</string>
+    </array>
+    <key>EnvironmentVariables</key>
+    <dict>
+        <key>MODE</key>
+        <string>$mode</string>
+        <key>GOOGLE_APPLICATION_CREDENTIALS</key>
+        <string>$credentials</string>
+    </dict>
+    <key>RunAtLoad</key>
+    <true/>
+    <key>KeepAlive</key>
+    <true/>
+</dict>
+</plist>
+""")
+_GCP_INTEGRATION = {
+    "direct_console_connection": True,
+    "secondary_storage_mode": True,
+    "auto_provisioning": True,
+    "storage_backend": "google_cloud_storage",
+    "platform_support": {
+        "windows": True,
+        "linux": True,
+        "macos": True
+    },
+    "supported_services": [
+        "Cloud Storage",
+        "Cloud Datastore", 
+        "Secret Manager",
+        "Cloud IAM",
+        "Cloud Monitoring"
+    ],
+    "integration_features": {
+        "transparent_mounting": True,
+        "real_time_sync": True,
+        "automatic_backup": True,
+        "cross_region_replication": True,
+        "encryption_at_rest": True,
+        "access_control_integration": True,
+        "cross_platform_compatibility": True
+    }
+}
 class CloudOSSetup:
+    _REQUIRED_IMPORT = (logging.ERROR, "Failed to import module: {module}")
+    _OPTIONAL_IMPORT = (logging.WARNING, "{module} import test failed. This is expected if the package failed to install.")
+    _FUSE_IMPORT = (logging.WARNING, "FUSE module test failed. This is expected if fuse is not installed or configured correctly.")
+    _BASE_IMPORTS = dict.fromkeys([
+        'google.cloud.storage',
+        'google.cloud.datastore',
+        'google.cloud.secretmanager',
+        'flask',
+        'requests',
+        'jwt',
+        'waitress'
+    ], _REQUIRED_IMPORT)
+    _IMPORTS = {
+        'windows': {**_BASE_IMPORTS, 'pywin32': _OPTIONAL_IMPORT, 'winfspy': _OPTIONAL_IMPORT},
+        'linux': {**_BASE_IMPORTS, 'fuse': _FUSE_IMPORT},
+        'darwin': {**_BASE_IMPORTS, 'fuse': _FUSE_IMPORT}
+    }
+    _STARTUP_DISPATCH = {
+        'windows': '_create_windows_scripts',
+        'linux': '_create_linux_services',
+        'darwin': '_create_macos_services'
+    }
     def __init__(self):
         self.system = platform.system().lower()
+        self._imports = self._IMPORTS.get(self.system, self._IMPORTS['linux'])
         self.is_root = self._check_admin_privileges()
         self.setup_dir = Path.home() / '.cloudos'
         self.config_file = self.setup_dir / 'config.json'
+        self.credentials_dir = self.setup_dir / 'credentials'
+        self.gcp_key_path = self.credentials_dir / 'gcp-service-account.json'
+        self.gcp_config_file = self.setup_dir / 'gcp_integration.json'
+        self._gcp_key_str = str(self.gcp_key_path)
+        self._venv_path = self.setup_dir / 'venv'
+        self._venv_python = self._venv_path / 'Scripts' / 'python.exe' if self.system == 'windows' else self._venv_path / 'bin' / 'python'
+        self._script_abs = os.path.abspath(__file__)
+        self._user = os.getenv('USER', 'cloudos')
     def _check_admin_privileges(self):
         if self.system == 'windows':
             try:
@@ -64,21 +204,21 @@ class CloudOSSetup:
             self.setup_dir / 'logs',
             self.setup_dir / 'cache',
             self.setup_dir / 'mount',
-            self.setup_dir / 'credentials'
+            self.credentials_dir
         ]
         for directory in directories:
             directory.mkdir(parents=True, exist_ok=True)
         if self.system == 'windows':
             try:
                 subprocess.run([
-                    'icacls', str(self.setup_dir / 'credentials'),
+                    'icacls', str(self.credentials_dir),
                     '/inheritance:d',
                     '/grant:r', f'{os.getenv("USERNAME")}:F'
                 ], check=False, capture_output=True)
             except:
                 logger.warning("Could not set secure permissions on Windows")
         else:
-            (self.setup_dir / 'credentials').chmod(0o700)
+            self.credentials_dir.chmod(0o700)
         logger.info(f"Directories created in {self.setup_dir}")
     def install_system_dependencies(self):
         logger.info("Installing system dependencies...")
@@ -182,20 +322,16 @@ class CloudOSSetup:
             logger.warning(f"Command error: {e}")
     def setup_python_environment(self):
         logger.info("Setting up Python environment...")
-        venv_path = self.setup_dir / 'venv'
-        if not venv_path.exists():
+        if not self._venv_path.exists():
             subprocess.run([
-                sys.executable, '-m', 'venv', str(venv_path)
+                sys.executable, '-m', 'venv', str(self._venv_path)
             ], check=True)
-        venv_python_path = venv_path / 'Scripts' / 'python.exe' if self.system == 'windows' else venv_path / 'bin' / 'python'
         subprocess.run([
-            str(venv_python_path), '-m', 'pip', 'install', '--upgrade', 'pip', 'wheel', 'setuptools'
+            str(self._venv_python), '-m', 'pip', 'install', '--upgrade', 'pip', 'wheel', 'setuptools'
         ], check=True)
         logger.info("Python virtual environment ready")
     def install_python_dependencies(self):
         logger.info("Installing Python dependencies...")
-        venv_path = self.setup_dir / 'venv'
-        venv_python_path = venv_path / 'Scripts' / 'python.exe' if self.system == 'windows' else venv_path / 'bin' / 'python'
         required_packages = [
             "google-api-core>=2.11.0",
             "google-cloud-storage>=2.10.0", 
@@ -206,7 +342,9 @@ class CloudOSSetup:
             "pyjwt>=2.8.0",
             "cachetools>=5.3.0",
             "cryptography>=41.0.0",
-            "werkzeug>=2.3.0"
+            "werkzeug>=2.3.0",
+            "orjson>=3.9.0",
+            "waitress>=2.1.0"
         ]
         if self.system == 'windows':
             required_packages.extend([
@@ -218,7 +356,7 @@ class CloudOSSetup:
         for package in required_packages:
             try:
                 subprocess.run([
-                    str(venv_python_path), '-m', 'pip', 'install', package
+                    str(self._venv_python), '-m', 'pip', 'install', package
                 ], check=True, capture_output=True)
                 logger.info(f"Installed: {package}")
             except subprocess.CalledProcessError as e:
@@ -231,10 +369,9 @@ class CloudOSSetup:
             fuse_conf = Path('/etc/fuse.conf')
             if fuse_conf.exists():
                 try:
-                    with open(fuse_conf, 'r') as f:
-                        content = f.read()
+                    content = fuse_conf.read_text(encoding='utf-8')
                     if 'user_allow_other' not in content:
-                        with open(fuse_conf, 'a') as f:
+                        with open(fuse_conf, 'a', encoding='utf-8') as f:
                             f.write('\nuser_allow_other\n')
                         logger.info("FUSE user_allow_other enabled")
                 except PermissionError:
@@ -260,71 +397,48 @@ class CloudOSSetup:
             "setup_version": "1.0.0",
             "platform": self.system
         }
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        write_json(self.config_file, config)
         if self.system == 'windows':
             env_file = self.setup_dir / 'cloudos.bat'
-            with open(env_file, 'w') as f:
-                f.write(f"set GCP_PROJECT_ID={config['project_id']}\n")
-                f.write(f"set GCS_BUCKET_NAME={config['bucket_name']}\n")
-                f.write(f"set JWT_SECRET_ID={config['jwt_secret_id']}\n")
-                f.write(f"set DATASTORE_KIND={config['datastore_kind']}\n")
-                f.write(f"set JWT_SECRET_VERSION={config['jwt_secret_version']}\n")
-                f.write(f"set CLOUDROM_BACKEND={config['backend_url']}\n")
-                f.write(f"set JWT_SECRET_VALUE={config['jwt_secret_value']}\n")
-                f.write(f"set MOUNTPOINT={config['mountpoint']}\n")
+            write_if_changed(
+                env_file,
+                f"set GCP_PROJECT_ID={config['project_id']}\n"
+                f"set GCS_BUCKET_NAME={config['bucket_name']}\n"
+                f"set JWT_SECRET_ID={config['jwt_secret_id']}\n"
+                f"set DATASTORE_KIND={config['datastore_kind']}\n"
+                f"set JWT_SECRET_VERSION={config['jwt_secret_version']}\n"
+                f"set CLOUDROM_BACKEND={config['backend_url']}\n"
+                f"set JWT_SECRET_VALUE={config['jwt_secret_value']}\n"
+                f"set MOUNTPOINT={config['mountpoint']}\n"
+            )
         else:
             env_file = self.setup_dir / 'cloudos.env'
-            with open(env_file, 'w') as f:
-                f.write(f"export GCP_PROJECT_ID='{config['project_id']}'\n")
-                f.write(f"export GCS_BUCKET_NAME='{config['bucket_name']}'\n")
-                f.write(f"export JWT_SECRET_ID='{config['jwt_secret_id']}'\n")
-                f.write(f"export DATASTORE_KIND='{config['datastore_kind']}'\n")
-                f.write(f"export JWT_SECRET_VERSION='{config['jwt_secret_version']}'\n")
-                f.write(f"export CLOUDROM_BACKEND='{config['backend_url']}'\n")
-                f.write(f"export JWT_SECRET_VALUE='{config['jwt_secret_value']}'\n")
-                f.write(f"export MOUNTPOINT='{config['mountpoint']}'\n")
+            write_if_changed(
+                env_file,
+                f"export GCP_PROJECT_ID='{config['project_id']}'\n"
+                f"export GCS_BUCKET_NAME='{config['bucket_name']}'\n"
+                f"export JWT_SECRET_ID='{config['jwt_secret_id']}'\n"
+                f"export DATASTORE_KIND='{config['datastore_kind']}'\n"
+                f"export JWT_SECRET_VERSION='{config['jwt_secret_version']}'\n"
+                f"export CLOUDROM_BACKEND='{config['backend_url']}'\n"
+                f"export JWT_SECRET_VALUE='{config['jwt_secret_value']}'\n"
+                f"export MOUNTPOINT='{config['mountpoint']}'\n"
+            )
         logger.info(f"Configuration saved to {self.config_file}")
     def setup_gcp_integration(self):
         logger.info("Setting up Google Cloud Platform integration...")
-        gcp_config = {
-            "direct_console_connection": True,
-            "secondary_storage_mode": True,
-            "auto_provisioning": True,
-            "storage_backend": "google_cloud_storage",
-            "platform_support": {
-                "windows": True,
-                "linux": True,
-                "macos": True
-            },
-            "supported_services": [
-                "Cloud Storage",
-                "Cloud Datastore", 
-                "Secret Manager",
-                "Cloud IAM",
-                "Cloud Monitoring"
-            ],
-            "integration_features": {
-                "transparent_mounting": True,
-                "real_time_sync": True,
-                "automatic_backup": True,
-                "cross_region_replication": True,
-                "encryption_at_rest": True,
-                "access_control_integration": True,
-                "cross_platform_compatibility": True
-            }
-        }
-        gcp_config_file = self.setup_dir / 'gcp_integration.json'
-        with open(gcp_config_file, 'w') as f:
-            json.dump(gcp_config, f, indent=2)
-        logger.info("Google Cloud Platform configured as secondary storage device")
-        logger.info("Direct Google Cloud Console connection established")
-        logger.info("GCP services available for transparent filesystem operations")
-        logger.info(f"{platform.system()} platform support enabled")
+        gcp_config = _GCP_INTEGRATION
+        write_json(self.gcp_config_file, gcp_config)
+        logger.info("\n".join([
+            "Google Cloud Platform configured as secondary storage device",
+            "Direct Google Cloud Console connection established",
+            "GCP services available for transparent filesystem operations",
+            f"{platform.system()} platform support enabled"
+        ]))
         return gcp_config
     def setup_gcp_credentials(self):
         logger.info("Setting up GCP credentials...")
-        gcp_key_path = self.setup_dir / 'credentials' / 'gcp-service-account.json'
+        gcp_key_path = self.gcp_key_path
         if not gcp_key_path.exists():
             logger.info("GCP Service Account setup required:")
             logger.info("1. Go to https://console.cloud.google.com/")
@@ -344,149 +458,105 @@ class CloudOSSetup:
                 "auth_uri": "https://accounts.google.com/o/oauth2/auth",
                 "token_uri": "https://oauth2.googleapis.com/token"
             }
-            with open(gcp_key_path, 'w') as f:
-                json.dump(placeholder, f, indent=2)
+            write_json(gcp_key_path, placeholder)
             logger.warning("Placeholder GCP credentials created. Replace with actual credentials.")
         else:
             logger.info("GCP credentials file found")
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = str(gcp_key_path)
+        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self._gcp_key_str
     def create_startup_scripts(self):
         logger.info("Creating startup scripts...")
-        if self.system == 'windows':
-            self._create_windows_scripts()
-        elif self.system == 'linux':
-            self._create_linux_services()
-        elif self.system == 'darwin':
-            self._create_macos_services()
+        getattr(self, self._STARTUP_DISPATCH[self.system])()
     def _create_windows_scripts(self):
         server_script = self.setup_dir / 'start-server.bat'
         client_script = self.setup_dir / 'start-client.bat'
-        venv_python_path = str(self.setup_dir / 'venv' / 'Scripts' / 'python.exe')
-        with open(server_script, 'w') as f:
-            f.write(f"""@echo off
-cd /d "{self.setup_dir}"
-call cloudos.bat
-set MODE=server
-"{venv_python_path}" "{os.path.abspath(__file__)}"
-pause
-""")
-        with open(client_script, 'w') as f:
-            f.write(f"""@echo off
-cd /d "{self.setup_dir}"
-call cloudos.bat
-set MODE=client
-"{venv_python_path}" "{os.path.abspath(__file__)}"
-pause
-""")
-        logger.info(f"Windows scripts created: {server_script}, {client_script}")
+        fields = {
+            'setup_dir': self.setup_dir,
+            'python': self._venv_python,
+            'script': self._script_abs
+        }
+        written = [
+            write_if_changed(server_script, _WINDOWS_SCRIPT.substitute(fields, mode='server')),
+            write_if_changed(client_script, _WINDOWS_SCRIPT.substitute(fields, mode='client'))
+        ]
+        if any(written):
+            logger.info(f"Windows scripts created: {server_script}, {client_script}")
     def _create_linux_services(self):
-        venv_python_path = str(self.setup_dir / 'venv' / 'bin' / 'python')
-        service_template = f"""[Unit]
-Description=Cloud OS {{mode}} Service
-After=network.target
-[Service]
-Type=simple
-User={os.getenv('USER', 'cloudos')}
-Group={os.getenv('USER', 'cloudos')}
-Environment=MODE={{mode}}
-Environment=GOOGLE_APPLICATION_CREDENTIALS={self.setup_dir / 'credentials' / 'gcp-service-account.json'}
-EnvironmentFile={self.setup_dir / 'cloudos.env'}
-ExecStart={venv_python_path} {os.path.abspath(__file__)}
-Restart=always
-RestartSec=10
-[Install]
-WantedBy=multi-user.target
-"""
-        services = {
-            'cloudos-server.service': service_template.format(mode='server'),
-            'cloudos-client.service': service_template.format(mode='client')
+        fields = {
+            'user': self._user,
+            'credentials': self._gcp_key_str,
+            'env_file': self.setup_dir / 'cloudos.env',
+            'python': self._venv_python,
+            'script': self._script_abs
         }
-        for filename, content in services.items():
-            service_file = self.setup_dir / filename
-            with open(service_file, 'w') as f:
-                f.write(content)
-            logger.info(f"Created service file: {service_file}")
+        for mode in ('server', 'client'):
+            service_file = self.setup_dir / f'cloudos-{mode}.service'
+            if write_if_changed(service_file, _LINUX_SERVICE.substitute(fields, mode=mode)):
+                logger.info(f"Created service file: {service_file}")
             logger.info(f"To install: sudo cp {service_file} /etc/systemd/system/")
     def _create_macos_services(self):
         logger.info("Creating macOS launch agents...")
-        venv_python_path = str(self.setup_dir / 'venv' / 'bin' / 'python')
-        plist_template = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>com.cloudos.{{mode}}</string>
-    <key>ProgramArguments</key>
-    <array>
-        <string>{venv_python_path}</string>
-        <string>{os.path.abspath(__file__)}</string>
-    </array>
-    <key>EnvironmentVariables</key>
-    <dict>
-        <key>MODE</key>
-        <string>{{mode}}</string>
-        <key>GOOGLE_APPLICATION_CREDENTIALS</key>
-        <string>{self.setup_dir / 'credentials' / 'gcp-service-account.json'}</string>
-    </dict>
-    <key>RunAtLoad</key>
-    <true/>
-    <key>KeepAlive</key>
-    <true/>
-</dict>
-</plist>
-"""
-        services = {
-            'com.cloudos.server.plist': plist_template.format(mode='server'),
-            'com.cloudos.client.plist': plist_template.format(mode='client')
+        fields = {
+            'python': self._venv_python,
+            'script': self._script_abs,
+            'credentials': self._gcp_key_str
         }
-        for filename, content in services.items():
-            plist_file = self.setup_dir / filename
-            with open(plist_file, 'w') as f:
-                f.write(content)
-            logger.info(f"Created launch agent: {plist_file}")
+        for mode in ('server', 'client'):
+            plist_file = self.setup_dir / f'com.cloudos.{mode}.plist'
+            if write_if_changed(plist_file, _MACOS_PLIST.substitute(fields, mode=mode)):
+                logger.info(f"Created launch agent: {plist_file}")
     def verify_installation(self):
         logger.info("Verifying installation...")
-        venv_path = self.setup_dir / 'venv'
-        if self.system == 'windows':
-            venv_python = venv_path / 'Scripts' / 'python.exe'
-        else:
-            venv_python = venv_path / 'bin' / 'python'
-        test_imports = [
-            'google.cloud.storage',
-            'google.cloud.datastore',
-            'google.cloud.secretmanager',
-            'flask',
-            'requests',
-            'jwt'
-        ]
-        if self.system == 'windows':
-            test_imports.extend(['pywin32', 'winfspy'])
-        else:
-            test_imports.append('fuse')
-        for module in test_imports:
-            try:
-                subprocess.run([
-                    str(venv_python), '-c', f'import {module}'
-                ], check=True, capture_output=True)
+        venv_python = self._venv_python
+        cache_file = self.setup_dir / 'cache' / 'verify.json'
+        cache_key = self._verify_cache_key()
+        try:
+            cached_key = read_json(cache_file).get('key')
+        except (OSError, ValueError):
+            cached_key = None
+        if cache_key and cached_key == cache_key:
+            logger.info("Installation verified (cached)")
+            return
+        check_script = (
+            "import sys\n"
+            "for m in sys.argv[1:]:\n"
+            "    try:\n"
+            "        __import__(m)\n"
+            "        print('OK', m)\n"
+            "    except Exception:\n"
+            "        print('FAIL', m)\n"
+        )
+        result = subprocess.run([
+            str(venv_python), '-c', check_script, *self._imports
+        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        imported = set()
+        for line in result.stdout.splitlines():
+            status, _, module = line.partition(' ')
+            if status == 'OK':
+                imported.add(module)
+        for module, (level, message) in self._imports.items():
+            if module in imported:
                 logger.info(f"{module} import successful")
-            except subprocess.CalledProcessError:
-                if module == 'fuse':
-                    logger.warning("FUSE module test failed. This is expected if fuse is not installed or configured correctly.")
-                elif module == 'pywin32' or module == 'winfspy':
-                    logger.warning(f"{module} import test failed. This is expected if the package failed to install.")
-                else:
-                    logger.error(f"Failed to import module: {module}")
+            else:
+                logger.log(level, message.format(module=module))
+        if cache_key and imported.issuperset(self._imports):
+            write_json(cache_file, {'key': cache_key})
+        else:
+            cache_file.unlink(missing_ok=True)
         if not venv_python.exists():
             logger.error(f"Python executable not found in venv: {venv_python}")
         else:
             logger.info(f"Python executable found: {venv_python}")
         logger.info("Installation verified")
+    def _verify_cache_key(self):
+        if not self._venv_python.exists():
+            return None
+        site_dirs = [*self._venv_path.glob('lib/python*/site-packages'), *self._venv_path.glob('Lib/site-packages')]
+        stamps = [str(p.stat().st_mtime_ns) for p in (self._venv_python, *site_dirs)]
+        return hashlib.sha256('|'.join(stamps + sorted(self._imports)).encode()).hexdigest()
     def display_gcp_integration_status(self):
         logger.info("Google Cloud Platform Integration Status:")
-        config_file = self.setup_dir / 'gcp_integration.json'
         try:
-            with open(config_file, 'r') as f:
-                config = json.load(f)
+            config = load_config(self.gcp_config_file)
             logger.info(f"  - Direct Console Connection: {'Enabled' if config['direct_console_connection'] else 'Disabled'}")
             logger.info(f"  - Secondary Storage Mode: {'Active' if config['secondary_storage_mode'] else 'Inactive'}")
             logger.info(f"  - Storage Backend: {config['storage_backend']}")
@@ -502,62 +572,101 @@ WantedBy=multi-user.target
     def display_next_steps(self):
         logger.info("\n--- NEXT STEPS ---")
         if self.system == 'windows':
-            logger.info(f"1. Open a command prompt and navigate to: {self.setup_dir}")
-            logger.info("2. To start the server, run: start-server.bat")
-            logger.info("3. To start the client, run: start-client.bat")
+            logger.info("\n".join([
+                f"1. Open a command prompt and navigate to: {self.setup_dir}",
+                "2. To start the server, run: start-server.bat",
+                "3. To start the client, run: start-client.bat"
+            ]))
         elif self.system == 'linux':
-            logger.info("1. The startup service files have been created.")
-            logger.info(f"2. To install the server service, run: sudo cp {self.setup_dir}/cloudos-server.service /etc/systemd/system/")
-            logger.info("3. To enable the server service, run: sudo systemctl enable cloudos-server.service")
-            logger.info("4. To start the server, run: sudo systemctl start cloudos-server.service")
-            logger.info(f"5. Repeat for the client service, using: cloudos-client.service")
+            logger.info("\n".join([
+                "1. The startup service files have been created.",
+                f"2. To install the server service, run: sudo cp {self.setup_dir}/cloudos-server.service /etc/systemd/system/",
+                "3. To enable the server service, run: sudo systemctl enable cloudos-server.service",
+                "4. To start the server, run: sudo systemctl start cloudos-server.service",
+                f"5. Repeat for the client service, using: cloudos-client.service"
+            ]))
         elif self.system == 'darwin':
-            logger.info("1. The startup launch agent files have been created.")
-            logger.info(f"2. To install the server agent, run: cp {self.setup_dir}/com.cloudos.server.plist ~/Library/LaunchAgents/")
-            logger.info("3. To load the server agent, run: launchctl load ~/Library/LaunchAgents/com.cloudos.server.plist")
-            logger.info(f"4. Repeat for the client agent, using: com.cloudos.client.plist")
-        logger.info("\nRemember to configure your GCP credentials in the placeholder file created.")
-        logger.info("You can find the file here: " + str(self.setup_dir / 'credentials' / 'gcp-service-account.json'))
+            logger.info("\n".join([
+                "1. The startup launch agent files have been created.",
+                f"2. To install the server agent, run: cp {self.setup_dir}/com.cloudos.server.plist ~/Library/LaunchAgents/",
+                "3. To load the server agent, run: launchctl load ~/Library/LaunchAgents/com.cloudos.server.plist",
+                f"4. Repeat for the client agent, using: com.cloudos.client.plist"
+            ]))
+        logger.info("\n".join([
+            "\nRemember to configure your GCP credentials in the placeholder file created.",
+            "You can find the file here: " + self._gcp_key_str
+        ]))
 class FileSystemOperations:
+    _LIST_CACHE_NAMES = 100000
     def __init__(self, config):
+        from cachetools import TTLCache
         self.config = config
         self.mountpoint = Path(config['mountpoint'])
         self.storage_backend = config['storage_backend']
-        self.gcs_client = None
-        if self.storage_backend == 'google_cloud_storage':
-            try:
-                from google.cloud import storage
-                self.gcs_client = storage.Client()
-            except ImportError:
-                logger.error("Google Cloud Storage library not found. Please run the setup script.")
-                sys.exit(1)
-            except Exception as e:
-                logger.error(f"Failed to initialize Google Cloud Storage client: {e}")
-                sys.exit(1)
+        self._list_cache = TTLCache(maxsize=self._LIST_CACHE_NAMES, ttl=config.get('list_cache_ttl', 60), getsizeof=len)
+        self._list_lock = threading.Lock()
+    @cached_property
+    def gcs_client(self):
+        try:
+            from google.cloud import storage
+            return storage.Client()
+        except ImportError:
+            logger.error("Google Cloud Storage library not found. Please run the setup script.")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to initialize Google Cloud Storage client: {e}")
+            raise
+    @cached_property
+    def bucket(self):
+        return self.gcs_client.bucket(self.config['bucket_name'])
     def create_mount_point(self, mountpoint):
         Path(mountpoint).mkdir(parents=True, exist_ok=True)
     def list_files(self, path):
         logger.info(f"Listing files in: {path}")
         if self.storage_backend == 'google_cloud_storage':
-            bucket = self.gcs_client.bucket(self.config['bucket_name'])
-            blobs = bucket.list_blobs(prefix=path)
-            return [blob.name for blob in blobs]
-        return []
+            with self._list_lock:
+                names = self._list_cache.get(path)
+            if names is not None:
+                return iter(names)
+            return self._list_and_cache(path)
+        return iter(())
+    def _list_and_cache(self, path):
+        names = []
+        for blob in self.bucket.list_blobs(prefix=path, page_size=1000, fields='items(name),nextPageToken'):
+            names.append(blob.name)
+            yield blob.name
+        if len(names) <= self._LIST_CACHE_NAMES:
+            with self._list_lock:
+                self._list_cache[path] = names
     def read_file(self, path):
         logger.info(f"Reading file: {path}")
         return "File content"
 def run_server(config):
     logger.info("Starting Cloud OS Server...")
     try:
-        from flask import Flask, request, jsonify
+        from flask import Flask, request, Response, stream_with_context
+        from waitress import serve
         app = Flask(__name__)
         fs_ops = FileSystemOperations(config)
+        if fs_ops.storage_backend == 'google_cloud_storage':
+            logger.info(f"Serving bucket {fs_ops.bucket.name}")
         @app.route('/list', methods=['GET'])
         def list_files_endpoint():
             path = request.args.get('path', '')
             files = fs_ops.list_files(path)
-            return jsonify({'files': files})
-        app.run(port=5000, debug=False)
+            # Pull the first batch before the response starts, so a listing error still becomes a 500
+            # instead of a truncated 200; only the remaining batches are streamed
+            batch = list(itertools.islice(files, 1000))
+            def generate(batch):
+                yield '{"files":['
+                sep = ''
+                while batch:
+                    yield sep + ','.join(json.dumps(name) for name in batch)
+                    sep = ','
+                    batch = list(itertools.islice(files, 1000))
+                yield ']}'
+            return Response(stream_with_context(generate(batch)), mimetype='application/json')
+        serve(app, host='127.0.0.1', port=5000, threads=int(config.get('server_threads', 8)))
     except ImportError as e:
         logger.error(f"Server dependencies missing: {e}")
         logger.info("Please run the setup script again to install all dependencies.")
@@ -592,12 +701,13 @@ def run_client(config):
                 logger.error(f"Failed to mount filesystem: {e}")
         else:
             logger.info("Cloud filesystem operations ready (Windows mode)")
-        try:
-            while True:
-                time.sleep(60)
-                logger.debug("Cloud OS Client heartbeat")
-        except KeyboardInterrupt:
-            logger.info("Cloud OS Client shutting down...")
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        heartbeat = 60 if logger.isEnabledFor(logging.DEBUG) or current_system == 'windows' else None
+        while not stop.wait(heartbeat):
+            logger.debug("Cloud OS Client heartbeat")
+        logger.info("Cloud OS Client shutting down...")
     else:
         logger.error(f"Unknown mode: {mode}")
         logger.info("Use MODE=server or MODE=client")
@@ -613,8 +723,7 @@ def main():
             logger.error(f"Configuration file not found at {config_path}")
             logger.info("Please run the setup script first: python script.py")
             sys.exit(1)
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_config(config_path)
         run_server(config)
     elif mode == 'client':
         config_path = Path.home() / '.cloudos' / 'config.json'
@@ -622,8 +731,7 @@ def main():
             logger.error(f"Configuration file not found at {config_path}")
             logger.info("Please run the setup script first: python script.py")
             sys.exit(1)
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_config(config_path)
         run_client(config)
     else:
         logger.error(f"Unknown mode: {mode}")